@@ -1,52 +1,74 @@
 """The homee integration."""
 
+import asyncio
 import logging
+import time
+from typing import Any
 
-from pyHomee import Homee, HomeeAuthFailedException, HomeeConnectionFailedException
+from pyHomee import HomeeAuthFailedException, HomeeConnectionFailedException
 from pyHomee.const import NodeProfile
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState
-from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant, ServiceCall, callback
-from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+)
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import (
+    ConfigEntryNotReady,
+    HomeAssistantError,
+    ServiceValidationError,
+)
 from homeassistant.helpers import (
     config_validation as cv,
     device_registry as dr,
     entity_registry as er,
 )
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     ATTR_ATTRIBUTE,
     ATTR_CONFIG_ENTRY_ID,
+    ATTR_FORCE,
+    ATTR_MAX_PARALLEL,
     ATTR_NODE,
     ATTR_VALUE,
+    ATTR_VALUES,
+    CONF_BACKGROUND_CONNECT,
+    CONF_GROUP_COMMANDS,
+    CONF_OPTIMISTIC,
+    CONF_OPTIMISTIC_TIMEOUT,
+    CONF_SKIP_REDUNDANT_COMMANDS,
+    CONF_SLIDER_LEADING_EDGE,
+    CONNECT_TIMEOUT,
     DOMAIN,
+    OPTIMISTIC_TIMEOUT,
+    REFRESH_ALL_TIMEOUT,
+    SERVICE_REFRESH_ALL,
+    SERVICE_SET_COMMAND_OPTIONS,
     SERVICE_SET_VALUE,
+    SET_VALUE_MAX_PARALLEL,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_VERSION,
 )
+from .helpers import get_registered_unique_ids
+from .hub import HomeeHub
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [
-    Platform.ALARM_CONTROL_PANEL,
-    Platform.BINARY_SENSOR,
-    Platform.CLIMATE,
-    Platform.COVER,
-    Platform.EVENT,
-    Platform.FAN,
-    Platform.LIGHT,
-    Platform.LOCK,
-    Platform.NUMBER,
-    Platform.SELECT,
-    Platform.SENSOR,
-    Platform.SIREN,
-    Platform.SWITCH,
-]
-
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-type HomeeConfigEntry = ConfigEntry[Homee]
+type HomeeConfigEntry = ConfigEntry[HomeeHub]
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
@@ -56,18 +78,30 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
     # Register the set_value service that can be used
     # for debugging and custom automations.
-    SET_VALUE_SCHEMA = vol.Schema(
-        {
-            vol.Required(ATTR_CONFIG_ENTRY_ID): str,
-            vol.Required(ATTR_NODE): int,
-            vol.Required(ATTR_ATTRIBUTE): int,
-            vol.Required(ATTR_VALUE): vol.Any(int, float, str),
-        }
+    VALUE_SCHEMA = {
+        vol.Required(ATTR_NODE): int,
+        vol.Required(ATTR_ATTRIBUTE): int,
+        vol.Required(ATTR_VALUE): vol.Any(int, float, str),
+    }
+    SET_VALUE_SCHEMA = vol.All(
+        vol.Schema(
+            {
+                vol.Required(ATTR_CONFIG_ENTRY_ID): str,
+                vol.Inclusive(ATTR_NODE, "single_value"): int,
+                vol.Inclusive(ATTR_ATTRIBUTE, "single_value"): int,
+                vol.Inclusive(ATTR_VALUE, "single_value"): vol.Any(int, float, str),
+                vol.Optional(ATTR_VALUES): [VALUE_SCHEMA],
+                vol.Optional(
+                    ATTR_MAX_PARALLEL, default=SET_VALUE_MAX_PARALLEL
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Optional(ATTR_FORCE, default=False): cv.boolean,
+            }
+        ),
+        cv.has_at_least_one_key(ATTR_NODE, ATTR_VALUES),
     )
 
-    async def async_handle_set_value(call: ServiceCall) -> None:
-        """Handle the set value service call."""
-
+    def get_homee(call: ServiceCall) -> HomeeHub:
+        """Return the homee of the config entry a service call targets."""
         if not (
             entry := hass.config_entries.async_get_entry(
                 call.data[ATTR_CONFIG_ENTRY_ID]
@@ -76,16 +110,137 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             raise ServiceValidationError("Entry not found")
         if entry.state is not ConfigEntryState.LOADED:
             raise ServiceValidationError("Entry not loaded")
-        homee: Homee = entry.runtime_data
+        return entry.runtime_data
 
-        node = call.data.get(ATTR_NODE, 0)
-        attribute = call.data.get(ATTR_ATTRIBUTE, 0)
-        value = call.data.get(ATTR_VALUE, 0)
+    async def async_handle_set_value(call: ServiceCall) -> ServiceResponse:
+        """Handle the set value service call."""
+        homee = get_homee(call)
+
+        items = list(call.data.get(ATTR_VALUES, []))
+        if ATTR_NODE in call.data:
+            items.insert(0, call.data)
+        semaphore = asyncio.Semaphore(call.data[ATTR_MAX_PARALLEL])
+
+        async def async_set_item(item: dict[str, Any]) -> dict[str, Any]:
+            """Set one value and return its result."""
+            node = item[ATTR_NODE]
+            attribute_id = item[ATTR_ATTRIBUTE]
+            value = item[ATTR_VALUE]
+            result: dict[str, Any] = {
+                ATTR_NODE: node,
+                ATTR_ATTRIBUTE: attribute_id,
+                ATTR_VALUE: value,
+                "success": False,
+            }
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    if not homee.connected:
+                        result["error"] = "Not connected to homee"
+                    elif (
+                        attribute := homee.index.get_attribute(node, attribute_id)
+                    ) is not None:
+                        # Every item is sent, so none is dropped by coalescing.
+                        result["skipped"] = not await homee.commands.async_set_value(
+                            attribute,
+                            value,
+                            force=call.data[ATTR_FORCE],
+                            coalesce=False,
+                        )
+                        result["success"] = True
+                    else:
+                        # Unknown attributes are sent as is, e.g. for debugging.
+                        await homee.set_value(node, attribute_id, value)
+                        result["success"] = True
+                except Exception as exc:  # pylint: disable=broad-except
+                    # One failed value must not hide the results of the others.
+                    _LOGGER.debug(
+                        "Setting attribute %s of node %s failed: %s",
+                        attribute_id,
+                        node,
+                        exc,
+                    )
+                    result["error"] = str(exc) or type(exc).__name__
+                result["duration"] = round(time.monotonic() - start, 4)
+            return result
+
+        start = time.monotonic()
+        results = await asyncio.gather(*(async_set_item(item) for item in items))
+        if not call.return_response:
+            return None
+
+        return {
+            "results": list(results),
+            "succeeded": sum(result["success"] for result in results),
+            "failed": sum(not result["success"] for result in results),
+            "duration": round(time.monotonic() - start, 4),
+        }
 
-        await homee.set_value(node, attribute, value)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_VALUE,
+        async_handle_set_value,
+        SET_VALUE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_refresh_all(call: ServiceCall) -> ServiceResponse:
+        """Request all nodes of homee and update the changed entities."""
+        homee = get_homee(call)
+        if not homee.connected:
+            # Someone expects homee to be there, so do not wait for the backoff.
+            homee.retry_now()
+            raise ServiceValidationError("Not connected to homee, reconnecting")
+
+        start = time.monotonic()
+        written = homee.state_writes.written
+        try:
+            async with asyncio.timeout(REFRESH_ALL_TIMEOUT):
+                result: dict[str, Any] = await homee.async_refresh_all()
+        except TimeoutError as exc:
+            raise HomeAssistantError("Timed out waiting for homee") from exc
+        homee.state_writes.async_flush()
+        result["state_writes"] = homee.state_writes.written - written
+        result["duration"] = round(time.monotonic() - start, 4)
+        _LOGGER.debug("Refreshed all nodes of homee: %s", result)
+        return result if call.return_response else None
 
     hass.services.async_register(
-        DOMAIN, SERVICE_SET_VALUE, async_handle_set_value, SET_VALUE_SCHEMA
+        DOMAIN,
+        SERVICE_REFRESH_ALL,
+        async_handle_refresh_all,
+        vol.Schema({vol.Required(ATTR_CONFIG_ENTRY_ID): str}),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_handle_set_command_options(call: ServiceCall) -> None:
+        """Store how homee entities send their commands in their options."""
+        registry = er.async_get(hass)
+        for entity_id in call.data[ATTR_ENTITY_ID]:
+            entity_entry = registry.async_get(entity_id)
+            if entity_entry is None or entity_entry.platform != DOMAIN:
+                raise ServiceValidationError(f"{entity_id} is not a homee entity")
+            registry.async_update_entity_options(
+                entity_id,
+                DOMAIN,
+                {
+                    **entity_entry.options.get(DOMAIN, {}),
+                    CONF_SKIP_REDUNDANT_COMMANDS: call.data[
+                        CONF_SKIP_REDUNDANT_COMMANDS
+                    ],
+                },
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_COMMAND_OPTIONS,
+        async_handle_set_command_options,
+        vol.Schema(
+            {
+                vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+                vol.Required(CONF_SKIP_REDUNDANT_COMMANDS): cv.boolean,
+            }
+        ),
     )
 
     return True
@@ -95,54 +250,148 @@ async def async_setup_entry(hass: HomeAssistant, entry: HomeeConfigEntry) -> boo
     """Set up homee from a config entry."""
     # Create the Homee api object using host, user,
     # password & pyHomee instance from the config
-    homee = Homee(
+    homee = HomeeHub(
         host=entry.data[CONF_HOST],
         user=entry.data[CONF_USERNAME],
         password=entry.data[CONF_PASSWORD],
         device="pymee_" + hass.config.location_name,
-        reconnect_interval=10,
-        max_retries=100,
     )
 
-    # Start the homee websocket connection as a new task
-    # and wait until we are connected
+    # In background connect mode setup does not wait for homee. Entities are
+    # unavailable until the connection listener reports the hub as connected.
+    background = entry.options.get(CONF_BACKGROUND_CONNECT, False)
+    homee.commands.group_commands = entry.options.get(CONF_GROUP_COMMANDS, False)
+    homee.commands.optimistic = entry.options.get(CONF_OPTIMISTIC, False)
+    homee.commands.optimistic_timeout = entry.options.get(
+        CONF_OPTIMISTIC_TIMEOUT, OPTIMISTIC_TIMEOUT
+    )
+    homee.commands.slider_leading_edge = entry.options.get(
+        CONF_SLIDER_LEADING_EDGE, False
+    )
+    homee.commands.async_setup(hass, entry)
+
     try:
         await homee.get_access_token()
     except HomeeConnectionFailedException as exc:
-        raise ConfigEntryNotReady(
-            f"Connection to Homee failed: {exc.__cause__}"
-        ) from exc
+        if not background:
+            raise ConfigEntryNotReady(
+                f"Connection to Homee failed: {exc.__cause__}"
+            ) from exc
+        _LOGGER.warning(
+            "Homee at %s not reachable, connecting in the background",
+            entry.data[CONF_HOST],
+        )
     except HomeeAuthFailedException as exc:
         raise ConfigEntryNotReady(
             f"Authentication to Homee failed: {exc.__cause__}"
         ) from exc
 
-    hass.loop.create_task(homee.run())
-    await homee.wait_until_connected()
-
-    # Migrate unique ids that are int.
-    await _migrate_old_unique_ids(hass, entry.entry_id)
-
-    # Log info about nodes, to facilitate recognition of unknown nodes.
-    for node in homee.nodes:
-        _LOGGER.info(
-            "Found node %s, with following Data: %s",
-            node.name,
-            node.raw_data,
-        )
+    # Build the entities from the last known topology if there is one,
+    # so setup does not have to wait for the full node dump of the hub.
+    store: Store[dict] = Store(
+        hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+    )
+    snapshot = await store.async_load()
+    if snapshot is not None and snapshot["uid"] == entry.unique_id:
+        homee.restore_snapshot(snapshot)
 
+    # Start the homee websocket connection as a new task
+    entry.async_create_background_task(
+        hass, homee.run_when_reachable(), "homee_connection"
+    )
     entry.runtime_data = homee
     entry.async_on_unload(homee.disconnect)
+    entry.async_on_unload(homee.state_writes.async_cancel)
+    entry.async_on_unload(homee.commands.async_cancel)
+
+    # Registered before waiting for homee, so options can be changed while it
+    # is not reachable. Other updates of the entry, like the minor version
+    # set by the unique id migration, do not need a reload.
+    options = dict(entry.options)
+
+    async def _async_options_updated(
+        _hass: HomeAssistant, updated_entry: HomeeConfigEntry
+    ) -> None:
+        """Reload homee if its options changed."""
+        if updated_entry.options != options:
+            await async_update_entry(hass, updated_entry)
+
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
+    async def _async_write_all_when_resynced() -> None:
+        """Write all entities once the values missed while offline arrived."""
+        try:
+            async with asyncio.timeout(CONNECT_TIMEOUT):
+                await homee.async_wait_resynced()
+        except TimeoutError:
+            _LOGGER.debug("homee sent no nodes after reconnecting")
+        homee.state_writes.async_write_all(hass, entry)
 
     def _connection_update_callback(connected: bool) -> None:
         """Call when the device is notified of changes."""
+        # Entities use the connection state of the hub for their availability.
         if connected:
             _LOGGER.warning("Reconnected to Homee at %s", entry.data[CONF_HOST])
+            # homee sends all nodes after connecting, only the changed
+            # attributes are dispatched, then every entity is written once.
+            entry.async_create_background_task(
+                hass, _async_write_all_when_resynced(), "homee_resync"
+            )
         else:
             _LOGGER.warning("Disconnected from Homee at %s", entry.data[CONF_HOST])
+            homee.state_writes.async_write_all(hass, entry)
 
     homee.add_connection_listener(_connection_update_callback)
 
+    if homee.restored:
+        entry.async_create_background_task(
+            hass,
+            _async_reconcile_snapshot(hass, entry, homee, store),
+            "homee_reconcile_snapshot",
+        )
+    elif background:
+        # Without a snapshot the nodes are unknown until homee sent them,
+        # so the platforms are set up once the hub is connected.
+        entry.async_create_background_task(
+            hass,
+            _async_setup_when_connected(hass, entry, homee, store),
+            "homee_setup_when_connected",
+        )
+        return True
+    else:
+        try:
+            async with asyncio.timeout(CONNECT_TIMEOUT):
+                await homee.wait_until_connected()
+        except TimeoutError as exc:
+            raise ConfigEntryNotReady(
+                f"Timed out waiting for Homee at {entry.data[CONF_HOST]}"
+            ) from exc
+        store.async_delay_save(homee.as_snapshot, SNAPSHOT_SAVE_DELAY)
+
+    await _async_setup_nodes(hass, entry, homee)
+
+    return True
+
+
+async def _async_setup_nodes(
+    hass: HomeAssistant, entry: HomeeConfigEntry, homee: HomeeHub, late: bool = False
+) -> None:
+    """Create the hub device and set up the platforms for the known nodes."""
+    # Unique ids of older versions are migrated by the platforms once,
+    # using a single lookup table of the registry entries.
+    if entry.minor_version < 2:
+        homee.registered_unique_ids = get_registered_unique_ids(hass, entry.entry_id)
+
+    # Log info about nodes, to facilitate recognition of unknown nodes.
+    for node in homee.nodes:
+        _LOGGER.info(
+            "Found node %s, with following Data: %s",
+            node.name,
+            node.raw_data,
+        )
+
+    homee.build_index()
+
     # create device register entry
     device_registry = dr.async_get(hass)
     device_registry.async_get_or_create(
@@ -158,22 +407,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: HomeeConfigEntry) -> boo
         hw_version="TBD",
     )
 
-    # Forward entry setup to the platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Forward entry setup to the platforms that have matching devices.
+    homee.platforms = homee.index.platforms()
+    if late:
+        await hass.config_entries.async_late_forward_entry_setups(
+            entry, homee.platforms
+        )
+    else:
+        await hass.config_entries.async_forward_entry_setups(entry, homee.platforms)
 
-    entry.async_on_unload(entry.add_update_listener(async_update_entry))
+    @callback
+    def _async_nodes_added() -> None:
+        """Set up platforms that are needed for nodes added to homee."""
+        if new_platforms := homee.index.platforms() - homee.platforms:
+            _LOGGER.debug("Setting up platforms %s for new nodes", new_platforms)
+            homee.platforms |= new_platforms
+            entry.async_create_task(
+                hass,
+                hass.config_entries.async_late_forward_entry_setups(
+                    entry, new_platforms
+                ),
+            )
 
-    return True
+    entry.async_on_unload(homee.add_nodes_added_listener(_async_nodes_added))
+
+    if homee.registered_unique_ids is not None:
+        # The forwarded platforms have migrated their entities by now. Old
+        # ids of platforms that were not set up are orphans and are not retried,
+        # so the migration is done after this first full pass.
+        homee.registered_unique_ids = None
+        hass.config_entries.async_update_entry(entry, minor_version=2)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: HomeeConfigEntry) -> bool:
     """Unload a homee config entry."""
     # Unload platforms
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(
+        entry, entry.runtime_data.platforms
+    )
 
     if unload_ok:
         # Get Homee object and remove it from data
-        homee: Homee = entry.runtime_data
+        homee: HomeeHub = entry.runtime_data
 
         # Schedule homee disconnect
         homee.disconnect()
@@ -181,6 +456,40 @@ async def async_unload_entry(hass: HomeAssistant, entry: HomeeConfigEntry) -> bo
     return unload_ok
 
 
+async def _async_reconcile_snapshot(
+    hass: HomeAssistant, entry: HomeeConfigEntry, homee: HomeeHub, store: Store
+) -> None:
+    """Update the snapshot once homee sent its nodes and reload on changes."""
+    await homee.wait_until_connected()
+    # The topology is compared when the node dump after connecting arrived.
+    await homee.async_wait_resynced()
+
+    if homee.topology_changed:
+        # The reloaded entry must not read the outdated snapshot again.
+        await store.async_save(homee.as_snapshot())
+        _LOGGER.info("Reloading homee to apply changed devices")
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+    else:
+        store.async_delay_save(homee.as_snapshot, SNAPSHOT_SAVE_DELAY)
+
+
+async def _async_setup_when_connected(
+    hass: HomeAssistant, entry: HomeeConfigEntry, homee: HomeeHub, store: Store
+) -> None:
+    """Set up the platforms once homee sent its nodes."""
+    await homee.wait_until_connected()
+    store.async_delay_save(homee.as_snapshot, SNAPSHOT_SAVE_DELAY)
+    await _async_setup_nodes(hass, entry, homee, late=True)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: HomeeConfigEntry) -> None:
+    """Remove the topology snapshot of a deleted homee config entry."""
+    store: Store[dict] = Store(
+        hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+    )
+    await store.async_remove()
+
+
 async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload homee integration after config change."""
     hass.config_entries.async_schedule_reload(entry.entry_id)
@@ -246,29 +555,3 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
         _LOGGER.info("Migration to v%s successful", config_entry.version)
 
     return True
-
-
-async def _migrate_old_unique_ids(hass: HomeAssistant, entry_id: str) -> None:
-    entity_registry = er.async_get(hass)
-
-    @callback
-    def _async_migrator(entity_entry: er.RegistryEntry) -> dict[str, str] | None:
-        # Climate entities had a string unique id.
-        if isinstance(entity_entry.unique_id, int):
-            new_unique_id = f"{entity_entry.unique_id}-climate"
-            if existing_entity_id := entity_registry.async_get_entity_id(
-                entity_entry.domain, entity_entry.platform, new_unique_id
-            ):
-                _LOGGER.error(
-                    "Cannot migrate to unique_id '%s', already exists for '%s', "
-                    "You may have to delete unavailable ring entities",
-                    new_unique_id,
-                    existing_entity_id,
-                )
-                return None
-            _LOGGER.info("Fixing non string unique id %s", entity_entry.unique_id)
-            return {"new_unique_id": new_unique_id}
-
-        return None
-
-    await er.async_migrate_entries(hass, entry_id, _async_migrator)
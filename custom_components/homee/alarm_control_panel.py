@@ -39,17 +39,14 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the switch component."""
 
-    devices: list[HomeeAlarmPanel] = []
-    for node in config_entry.runtime_data.nodes:
-        devices.extend(
-            HomeeAlarmPanel(node, config_entry, attribute)
-            for attribute in node.attributes
-            if attribute.type == AttributeType.HOMEE_MODE
-            and attribute.editable
-            and node.id == -1
-        )
+    index = config_entry.runtime_data.index
+    devices: list[HomeeAlarmPanel] = [
+        HomeeAlarmPanel(index.node_of(attribute), config_entry, attribute)
+        for attribute in index.attributes(AttributeType.HOMEE_MODE)
+        if attribute.editable and attribute.node_id == -1
+    ]
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.ALARM_CONTROL_PANEL)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.ALARM_CONTROL_PANEL)
         async_add_devices(devices)
 
 
@@ -70,6 +67,7 @@ class HomeeAlarmPanel(HomeeNodeEntity, AlarmControlPanelEntity):
         self._alarm_panel_attribute = alarm_panel_attribute
         self._attr_supported_features = get_features(alarm_panel_attribute)
         self._attr_translation_key = "homee_status"
+        self.track_attributes(alarm_panel_attribute)
 
         self._attr_unique_id = f"{entry.runtime_data.settings.uid}-{node.id}-{self._alarm_panel_attribute.id}"
 
@@ -91,8 +89,7 @@ class HomeeAlarmPanel(HomeeNodeEntity, AlarmControlPanelEntity):
 
     async def async_update(self) -> None:
         """Update entity from homee."""
-        homee = self._entry.runtime_data
-        await homee.update_attribute(
+        await self._entry.runtime_data.commands.async_refresh(
             self._alarm_panel_attribute.node_id, self._alarm_panel_attribute.id
         )
 
@@ -158,17 +158,15 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the binary sensor integration."""
 
-    devices: list[HomeeBinarySensor] = []
-    for node in config_entry.runtime_data.nodes:
-        devices.extend(
-            HomeeBinarySensor(
-                attribute, config_entry, BINARY_SENSOR_DESCRIPTIONS[attribute.type]
-            )
-            for attribute in node.attributes
-            if attribute.type in BINARY_SENSOR_DESCRIPTIONS and not attribute.editable
-        )
+    index = config_entry.runtime_data.index
+    devices: list[HomeeBinarySensor] = [
+        HomeeBinarySensor(attribute, config_entry, description)
+        for attribute_type, description in BINARY_SENSOR_DESCRIPTIONS.items()
+        for attribute in index.attributes(attribute_type)
+        if not attribute.editable
+    ]
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.BINARY_SENSOR)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.BINARY_SENSOR)
         async_add_devices(devices)
 
 
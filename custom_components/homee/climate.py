@@ -3,9 +3,10 @@
 from typing import Any
 
 from pyHomee.const import AttributeType, NodeProfile
-from pyHomee.model import HomeeNode
+from pyHomee.model import HomeeAttribute, HomeeNode
 
 from homeassistant.components.climate import (
+    ATTR_HVAC_MODE,
     ATTR_TEMPERATURE,
     PRESET_BOOST,
     PRESET_ECO,
@@ -42,11 +43,10 @@ async def async_setup_entry(
 
     devices = [
         HomeeClimate(node, config_entry)
-        for node in config_entry.runtime_data.nodes
-        if node.profile in CLIMATE_PROFILES
+        for node in config_entry.runtime_data.index.nodes(*CLIMATE_PROFILES)
     ]
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.CLIMATE)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.CLIMATE)
         async_add_devices(devices)
 
 
@@ -81,6 +81,12 @@ class HomeeClimate(HomeeNodeEntity, ClimateEntity):
         self._valve_position = self._node.get_attribute_by_type(
             AttributeType.CURRENT_VALVE_POSITION
         )
+        self.track_attributes(
+            self._target_temp,
+            self._heating_mode,
+            self._temperature,
+            self._valve_position,
+        )
 
     @property
     def old_unique_id(self) -> str:
@@ -177,10 +183,19 @@ class HomeeClimate(HomeeNodeEntity, ClimateEntity):
     async def async_set_temperature(self, **kwargs: Any) -> None:
         """Set new target temperature."""
         assert self._target_temp is not None
-        if ATTR_TEMPERATURE in kwargs:
-            await self.async_set_value(
-                self._target_temp, kwargs[ATTR_TEMPERATURE]
+        values: list[tuple[HomeeAttribute, float]] = []
+        if (
+            hvac_mode := kwargs.get(ATTR_HVAC_MODE)
+        ) is not None and self._heating_mode is not None:
+            values.append(
+                (
+                    self._heating_mode,
+                    float(hvac_mode == HVACMode.HEAT) + self._heating_mode.minimum,
+                )
             )
+        if ATTR_TEMPERATURE in kwargs:
+            values.append((self._target_temp, kwargs[ATTR_TEMPERATURE]))
+        await self.async_set_values(*values)
 
     async def async_turn_on(self) -> None:
         """Turn the entity on."""
@@ -0,0 +1,157 @@
+"""Coalescing of entity state writes for bursts of homee updates."""
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+from .const import STATE_WRITE_CHUNK_SIZE, STATE_WRITE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_fingerprint(entity: Entity) -> tuple[Any, ...]:
+    """Return the parts of an entity that end up in its state object."""
+    if not entity.available:
+        return (False,)
+    return (
+        True,
+        entity.state,
+        entity.unit_of_measurement,
+        entity.state_attributes,
+        entity.extra_state_attributes,
+    )
+
+
+class StateWriteCoalescer:
+    """Write the state of updated entities once per burst of homee updates."""
+
+    def __init__(self, delay: float = STATE_WRITE_DELAY) -> None:
+        """Initialize the coalescer.
+
+        With a delay of 0 entities are written once per event loop iteration.
+        """
+        self.delay = delay
+        self.requested = 0
+        self.written = 0
+        self.saved = 0
+        # Writes skipped because the rendered state did not change, per platform.
+        self.suppressed: Counter[str] = Counter()
+        # Tracked entities with the fingerprint of their last written state.
+        self._entities: dict[Entity, tuple[Any, ...] | None] = {}
+        self._pending: dict[Entity, None] = {}
+        self._flush_handle: asyncio.Handle | None = None
+        self._write_all_task: asyncio.Task | None = None
+
+    @callback
+    def async_track(self, entity: Entity) -> Callable[[], None]:
+        """Add an entity to the writes of all entities on connection changes."""
+        self._entities[entity] = None
+
+        @callback
+        def remove_entity() -> None:
+            self._entities.pop(entity, None)
+            self._pending.pop(entity, None)
+
+        return remove_entity
+
+    @callback
+    def async_schedule(self, entity: Entity) -> None:
+        """Mark an entity for a state write with the next flush."""
+        self.requested += 1
+        if entity in self._pending:
+            self.saved += 1
+            return
+
+        self._pending[entity] = None
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.delay:
+                self._flush_handle = loop.call_later(self.delay, self._async_flush)
+            else:
+                self._flush_handle = loop.call_soon(self._async_flush)
+
+    @callback
+    def async_flush(self) -> None:
+        """Write the pending entities now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._async_flush()
+
+    @callback
+    def async_write_all(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Write the state of all entities in the background.
+
+        A running pass is restarted, so flapping connections write each
+        entity with the latest availability only.
+        """
+        if self._write_all_task is not None:
+            self._write_all_task.cancel()
+        self._write_all_task = entry.async_create_background_task(
+            hass, self._async_write_all(), "homee_write_all_states"
+        )
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop all pending writes."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._write_all_task is not None:
+            self._write_all_task.cancel()
+            self._write_all_task = None
+        self._pending.clear()
+        _LOGGER.debug(
+            "State writes: %s requested, %s written, %s saved, %s unchanged",
+            self.requested,
+            self.written,
+            self.saved,
+            dict(self.suppressed),
+        )
+
+    async def _async_write_all(self) -> None:
+        """Write all entities in chunks and yield to the event loop in between."""
+        entities = list(self._entities)
+        for start in range(0, len(entities), STATE_WRITE_CHUNK_SIZE):
+            for entity in entities[start : start + STATE_WRITE_CHUNK_SIZE]:
+                if entity in self._entities:
+                    self._pending.pop(entity, None)
+                    self._async_write_logged(entity)
+            await asyncio.sleep(0)
+        self._write_all_task = None
+
+    @callback
+    def _async_flush(self) -> None:
+        """Write the state of all pending entities."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for entity in pending:
+            self._async_write_logged(entity)
+
+    @callback
+    def _async_write_logged(self, entity: Entity) -> None:
+        """Write an entity and log a failure instead of losing the other writes."""
+        try:
+            self._async_write(entity)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error writing the state of %s", entity.entity_id)
+
+    @callback
+    def _async_write(self, entity: Entity) -> None:
+        """Write the state of an entity unless the rendered state is unchanged."""
+        fingerprint = None
+        if entity in self._entities:
+            fingerprint = get_fingerprint(entity)
+            if fingerprint == self._entities[entity]:
+                self.suppressed[entity.platform.domain] += 1
+                return
+
+        entity.async_write_ha_state()
+        self.written += 1
+        if entity in self._entities:
+            self._entities[entity] = fingerprint
@@ -0,0 +1,455 @@
+"""Outbound commands from the entities to homee."""
+
+import asyncio
+from collections.abc import Coroutine
+from dataclasses import dataclass, field
+from functools import partial
+import logging
+from typing import TYPE_CHECKING, Any
+
+from pyHomee.const import AttributeState, AttributeType
+from pyHomee.model import HomeeAttribute, HomeeGroup
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    GROUP_COMMAND,
+    IMPULSE_ATTRIBUTES,
+    OPTIMISTIC_TIMEOUT,
+    REFRESH_WINDOW,
+    SLIDER_ATTRIBUTES,
+    SLIDER_QUIET_PERIOD,
+)
+from .latency import CommandLatency
+from .scheduler import CommandScheduler
+
+if TYPE_CHECKING:
+    from .hub import HomeeHub
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_group_attributes(
+    group: HomeeGroup, attribute_type: AttributeType
+) -> list[HomeeAttribute]:
+    """Return the attributes of a type of all nodes in a group."""
+    return [
+        attribute
+        for node in group.nodes
+        for attribute in node.attributes
+        if attribute.type == attribute_type
+    ]
+
+
+@dataclass
+class OptimisticValue:
+    """A value shown before homee confirmed it."""
+
+    attribute: HomeeAttribute
+    value: float
+    hub_data: dict[str, Any]
+    timeout: asyncio.TimerHandle
+
+
+@dataclass
+class SliderValue:
+    """The last value of a slider that is not sent yet."""
+
+    sent: asyncio.Future[None]
+    value: float | None = None
+    quiet: asyncio.TimerHandle | None = None
+    leading_value: float | None = None
+
+
+@dataclass
+class NodeRefresh:
+    """A request of current data for a node, shared by its waiters."""
+
+    done: asyncio.Future[None]
+    timer: asyncio.TimerHandle
+    attribute_ids: set[int] = field(default_factory=set)
+    whole_node: bool = False
+
+
+class HomeeCommands:
+    """Send the attribute values set by the entities to homee."""
+
+    def __init__(
+        self, homee: "HomeeHub", scheduler: CommandScheduler | None = None
+    ) -> None:
+        """Initialize the commands."""
+        self._homee = homee
+        self._hass: HomeAssistant | None = None
+        self._entry: ConfigEntry | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.scheduler = scheduler or CommandScheduler()
+        self.latency = CommandLatency()
+        # Send one command to a homee group, if a service call sets the same
+        # value on all attributes of a type in that group.
+        self.group_commands = False
+        self.group_commands_sent = 0
+        self.node_commands_saved = 0
+        self._batch: dict[tuple[AttributeType, float], dict[HomeeAttribute, None]] = {}
+        self._batch_task: asyncio.Task | None = None
+        # Show values of optimistic entities before homee confirms them and
+        # roll back if homee does not within the timeout.
+        self.optimistic = False
+        self.optimistic_timeout: float = OPTIMISTIC_TIMEOUT
+        self.confirmations = 0
+        self.rollbacks = 0
+        self._optimistic: dict[tuple[int, int], OptimisticValue] = {}
+        # Send only the last value of a burst of slider values, optionally
+        # with the first one sent right away.
+        self.slider_quiet_period: float = SLIDER_QUIET_PERIOD
+        self.slider_leading_edge = False
+        self.slider_values_dropped = 0
+        self._sliders: dict[HomeeAttribute, SliderValue] = {}
+        # Skip values homee already has or is already setting.
+        self.redundant_skipped = 0
+        self._in_flight: dict[HomeeAttribute, float] = {}
+        # Refreshes of a node and its attributes requested at the same time
+        # are sent as one request.
+        self.refreshes_saved = 0
+        self._refreshes: dict[int, NodeRefresh] = {}
+
+    @callback
+    def async_setup(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Run the commands sent in the background as tasks of the entry."""
+        self._hass = hass
+        self._entry = entry
+
+    @callback
+    def _async_create_task(
+        self, target: Coroutine[Any, Any, None], name: str
+    ) -> asyncio.Task[None]:
+        """Create a task that is cancelled with the commands."""
+        if self._hass is not None and self._entry is not None:
+            task = self._entry.async_create_background_task(self._hass, target, name)
+        else:
+            task = asyncio.get_running_loop().create_task(target, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def async_set_value(
+        self,
+        attribute: HomeeAttribute,
+        value: float,
+        optimistic: bool = False,
+        force: bool = False,
+        coalesce: bool | None = None,
+    ) -> bool:
+        """Set the value of an attribute.
+
+        Values of sliders are coalesced by default. Values that belong
+        together, like the values of one entity call, must all be coalesced
+        or none, so they are still sent together.
+
+        Return False if the value was skipped, as homee already has it.
+        """
+        if coalesce is None:
+            coalesce = attribute.type in SLIDER_ATTRIBUTES
+        if (
+            not force
+            and attribute.type not in IMPULSE_ATTRIBUTES
+            and self._is_redundant(attribute, value)
+        ):
+            self.redundant_skipped += 1
+            return False
+
+        if optimistic and self.optimistic:
+            self._async_apply_optimistic(attribute, value)
+
+        self._in_flight[attribute] = value
+        try:
+            if coalesce:
+                await self._async_set_slider_value(attribute, value)
+            else:
+                await self._async_send(attribute, value)
+        finally:
+            if self._in_flight.get(attribute) == value:
+                del self._in_flight[attribute]
+        return True
+
+    def _is_redundant(self, attribute: HomeeAttribute, value: float) -> bool:
+        """Return if homee has the value or a command for it is underway."""
+        if (in_flight := self._in_flight.get(attribute)) is not None:
+            return in_flight == value
+        if attribute.target_value != value:
+            return False
+        return (
+            attribute.current_value == value
+            or attribute.state == AttributeState.WAITING_FOR_ACKNOWLEDGE
+        )
+
+    async def _async_set_slider_value(
+        self, attribute: HomeeAttribute, value: float
+    ) -> None:
+        """Replace the pending value of a slider and send it when it rests."""
+        loop = asyncio.get_running_loop()
+        if (slider := self._sliders.get(attribute)) is None:
+            slider = self._sliders[attribute] = SliderValue(loop.create_future())
+            if self.slider_leading_edge:
+                slider.leading_value = value
+                slider.quiet = loop.call_later(
+                    self.slider_quiet_period, self._async_slider_rested, attribute
+                )
+                await self._async_send(attribute, value)
+                return
+        else:
+            if slider.value is not None:
+                self.slider_values_dropped += 1
+            if slider.quiet is not None:
+                slider.quiet.cancel()
+
+        slider.value = value
+        slider.quiet = loop.call_later(
+            self.slider_quiet_period, self._async_slider_rested, attribute
+        )
+        await asyncio.shield(slider.sent)
+
+    @callback
+    def _async_slider_rested(self, attribute: HomeeAttribute) -> None:
+        """Send the last value of a slider after the quiet period."""
+        slider = self._sliders.pop(attribute)
+        if slider.value is None or slider.value == slider.leading_value:
+            slider.sent.set_result(None)
+            return
+
+        value = slider.value
+
+        async def _async_send_last() -> None:
+            try:
+                await self._async_send(attribute, value)
+            except Exception as exc:  # pylint: disable=broad-except
+                slider.sent.set_exception(exc)
+            else:
+                slider.sent.set_result(None)
+
+        self._async_create_task(_async_send_last(), "homee_slider_value")
+
+    async def _async_send(self, attribute: HomeeAttribute, value: float) -> None:
+        """Send the value of an attribute, batched into group commands."""
+        if not self.group_commands:
+            await self._async_send_to_node(attribute, value)
+            return
+
+        # HA runs the entities of one service call concurrently, so their
+        # commands are collected until the next event loop iteration.
+        self._batch.setdefault((attribute.type, value), {})[attribute] = None
+        if self._batch_task is None:
+            self._batch_task = self._async_create_task(
+                self._async_send_batch(), "homee_group_commands"
+            )
+        await asyncio.shield(self._batch_task)
+
+    async def _async_send_batch(self) -> None:
+        """Send the collected commands, using groups where possible."""
+        batch, self._batch = self._batch, {}
+        self._batch_task = None
+
+        for (attribute_type, value), attributes in batch.items():
+            if len(attributes) > 1:
+                await self._async_send_group_commands(attribute_type, value, attributes)
+            await asyncio.gather(
+                *(
+                    self._async_send_to_node(attribute, value)
+                    for attribute in attributes
+                )
+            )
+
+    async def _async_send_to_node(
+        self, attribute: HomeeAttribute, value: float
+    ) -> None:
+        """Send the value of an attribute paced by the protocol of its node."""
+        protocol = self._homee.index.node_of(attribute).protocol
+
+        async def _async_send() -> None:
+            self.latency.async_sent(attribute, protocol)
+            await self._homee.set_value(attribute.node_id, attribute.id, value)
+
+        await self.scheduler.async_run(protocol, _async_send, attribute.node_id)
+
+    async def _async_send_group_commands(
+        self,
+        attribute_type: AttributeType,
+        value: float,
+        attributes: dict[HomeeAttribute, None],
+    ) -> None:
+        """Send commands to groups fully covered by the attributes.
+
+        Attributes handled by a group command are removed from attributes.
+        """
+        for group in sorted(
+            self._homee.groups, key=lambda group: len(group.nodes), reverse=True
+        ):
+            group_attributes = get_group_attributes(group, attribute_type)
+            if len(group_attributes) < 2 or any(
+                attribute not in attributes for attribute in group_attributes
+            ):
+                continue
+
+            _LOGGER.debug(
+                "Set value of %s attributes with group %s",
+                len(group_attributes),
+                group.id,
+            )
+            for attribute in group_attributes:
+                self.latency.async_sent(
+                    attribute, self._homee.index.node_of(attribute).protocol
+                )
+            await self.scheduler.async_run(
+                None,
+                partial(
+                    self._homee.send,
+                    GROUP_COMMAND.format(
+                        group_id=group.id,
+                        attribute_type=int(attribute_type),
+                        value=value,
+                    ),
+                ),
+            )
+            self.group_commands_sent += 1
+            self.node_commands_saved += len(group_attributes) - 1
+            for attribute in group_attributes:
+                del attributes[attribute]
+
+    @callback
+    def _async_apply_optimistic(self, attribute: HomeeAttribute, value: float) -> None:
+        """Show the value until homee confirms it."""
+        key = (attribute.node_id, attribute.id)
+        if (pending := self._optimistic.pop(key, None)) is not None:
+            pending.timeout.cancel()
+            hub_data = pending.hub_data
+        else:
+            hub_data = attribute.raw_data
+        if hub_data["current_value"] == value:
+            if pending is not None:
+                attribute.set_data(hub_data)
+                self._homee.dispatcher.async_dispatch_attribute(*key)
+            return
+
+        self._optimistic[key] = OptimisticValue(
+            attribute,
+            value,
+            hub_data,
+            asyncio.get_running_loop().call_later(
+                self.optimistic_timeout, self._async_rollback, key
+            ),
+        )
+        attribute.set_data({**hub_data, "current_value": value})
+        self._homee.dispatcher.async_dispatch_attribute(*key)
+
+    def is_optimistic(self, node_id: int, attribute_id: int) -> bool:
+        """Return if an optimistic value of the attribute is shown."""
+        return (node_id, attribute_id) in self._optimistic
+
+    @callback
+    def async_attribute_received(self, node_id: int, attribute_id: int) -> None:
+        """Confirm, keep or drop an optimistic value after homee sent data.
+
+        pyHomee already replaced the data of the attribute with the received
+        data, so the optimistic value is applied again while homee still works
+        on the command.
+        """
+        key = (node_id, attribute_id)
+        if (pending := self._optimistic.get(key)) is None:
+            return
+
+        attribute = pending.attribute
+        if attribute.current_value == pending.value:
+            self.confirmations += 1
+        elif attribute.current_value == pending.hub_data["current_value"]:
+            if (
+                attribute.target_value == pending.value
+                or attribute.state == AttributeState.WAITING_FOR_ACKNOWLEDGE
+            ):
+                pending.hub_data = attribute.raw_data
+                attribute.set_data({**pending.hub_data, "current_value": pending.value})
+                return
+            # homee rejected or replaced the command.
+            self.rollbacks += 1
+        # Otherwise homee moved on, e.g. a cover started opening.
+
+        pending.timeout.cancel()
+        del self._optimistic[key]
+
+    @callback
+    def _async_rollback(self, key: tuple[int, int]) -> None:
+        """Show the data of homee again, as it did not confirm the value."""
+        pending = self._optimistic.pop(key)
+        _LOGGER.debug(
+            "homee did not confirm value %s of attribute %s of node %s",
+            pending.value,
+            key[1],
+            key[0],
+        )
+        self.rollbacks += 1
+        pending.attribute.set_data(pending.hub_data)
+        self._homee.dispatcher.async_dispatch_attribute(*key)
+
+    async def async_refresh(
+        self, node_id: int, attribute_id: int | None = None
+    ) -> None:
+        """Request current data of a node or one of its attributes.
+
+        Refreshes of the same node within the refresh window share a single
+        request, which asks for the whole node if more than one attribute is
+        refreshed.
+        """
+        if (refresh := self._refreshes.get(node_id)) is None:
+            loop = asyncio.get_running_loop()
+            refresh = self._refreshes[node_id] = NodeRefresh(
+                loop.create_future(),
+                loop.call_later(REFRESH_WINDOW, self._async_send_refresh, node_id),
+            )
+        else:
+            self.refreshes_saved += 1
+
+        if attribute_id is None:
+            refresh.whole_node = True
+        else:
+            refresh.attribute_ids.add(attribute_id)
+        await asyncio.shield(refresh.done)
+
+    @callback
+    def _async_send_refresh(self, node_id: int) -> None:
+        """Send the collected refreshes of a node."""
+        refresh = self._refreshes.pop(node_id)
+
+        async def _async_send() -> None:
+            try:
+                if refresh.whole_node or len(refresh.attribute_ids) > 1:
+                    await self._homee.update_node(node_id)
+                else:
+                    await self._homee.update_attribute(
+                        node_id, next(iter(refresh.attribute_ids))
+                    )
+            except Exception as exc:  # pylint: disable=broad-except
+                refresh.done.set_exception(exc)
+            else:
+                refresh.done.set_result(None)
+
+        self._async_create_task(_async_send(), "homee_refresh")
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the pending rollbacks, slider values, refreshes and tasks."""
+        _LOGGER.debug("Commands sent per protocol: %s", self.scheduler.stats())
+        for pending in self._optimistic.values():
+            pending.timeout.cancel()
+        self._optimistic.clear()
+        for slider in self._sliders.values():
+            if slider.quiet is not None:
+                slider.quiet.cancel()
+            slider.sent.cancel()
+        self._sliders.clear()
+        for refresh in self._refreshes.values():
+            refresh.timer.cancel()
+            refresh.done.cancel()
+        self._refreshes.clear()
+        self._batch.clear()
+        self._batch_task = None
+        for task in self._tasks:
+            task.cancel()
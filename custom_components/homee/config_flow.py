@@ -11,10 +11,25 @@ from pyHomee import (
 import voluptuous as vol
 
 from homeassistant import config_entries, core, exceptions
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
-
-from .const import DOMAIN
+from homeassistant.core import callback
+
+from .const import (
+    CONF_BACKGROUND_CONNECT,
+    CONF_GROUP_COMMANDS,
+    CONF_OPTIMISTIC,
+    CONF_OPTIMISTIC_TIMEOUT,
+    CONF_SENSOR_FILTER,
+    CONF_SLIDER_LEADING_EDGE,
+    DOMAIN,
+    OPTIMISTIC_TIMEOUT,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,6 +41,19 @@ AUTH_SCHEMA = vol.Schema(
     }
 )
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_BACKGROUND_CONNECT, default=False): bool,
+        vol.Optional(CONF_GROUP_COMMANDS, default=False): bool,
+        vol.Optional(CONF_OPTIMISTIC, default=False): bool,
+        vol.Optional(CONF_OPTIMISTIC_TIMEOUT, default=OPTIMISTIC_TIMEOUT): vol.All(
+            int, vol.Range(min=1, max=300)
+        ),
+        vol.Optional(CONF_SLIDER_LEADING_EDGE, default=False): bool,
+        vol.Optional(CONF_SENSOR_FILTER, default=False): bool,
+    }
+)
+
 
 async def validate_and_connect(hass: core.HomeAssistant, data) -> Homee:
     """Validate the user input allows us to connect."""
@@ -62,9 +90,16 @@ class HomeeConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for homee."""
 
     VERSION = 1
+    MINOR_VERSION = 2
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_PUSH
     homee: Homee
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return HomeeOptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -160,6 +195,24 @@ class HomeeConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+class HomeeOptionsFlowHandler(OptionsFlow):
+    """Handle the options of a homee config entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, self.config_entry.options
+            ),
+        )
+
+
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
 
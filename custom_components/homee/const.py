@@ -1,12 +1,15 @@
 """Constants for the homee integration."""
 
-from pyHomee.const import NodeProfile
+from collections.abc import Iterable
+
+from pyHomee.const import AttributeType, NodeProfile, NodeProtocol
 
 from homeassistant.const import (
     DEGREE,
     LIGHT_LUX,
     PERCENTAGE,
     REVOLUTIONS_PER_MINUTE,
+    Platform,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
     UnitOfEnergy,
@@ -22,6 +25,88 @@ from homeassistant.const import (
 # General
 DOMAIN = "homee"
 
+# Options
+CONF_BACKGROUND_CONNECT = "background_connect"
+CONF_GROUP_COMMANDS = "group_commands"
+CONF_OPTIMISTIC = "optimistic"
+CONF_OPTIMISTIC_TIMEOUT = "optimistic_timeout"
+CONF_SENSOR_FILTER = "sensor_filter"
+CONF_SLIDER_LEADING_EDGE = "slider_leading_edge"
+
+# Sensor entity options, stored in the entity registry options of the domain
+# by the set_sensor_filter service.
+CONF_DEADBAND = "deadband"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_RELATIVE_DEADBAND = "relative_deadband"
+# Entity option stored by the set_command_options service.
+CONF_SKIP_REDUNDANT_COMMANDS = "skip_redundant_commands"
+
+# Seconds after which a sensor value held back by its deadband is published.
+DEADBAND_FLUSH_INTERVAL = 60
+
+# Seconds setup waits for the first node dump of homee.
+CONNECT_TIMEOUT = 30
+
+# Port of the homee API, probed while waiting to reconnect.
+HOMEE_PORT = 7681
+# Seconds before reconnecting, doubled from the minimum with every attempt.
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 300
+# Seconds between probes of homee while waiting to reconnect.
+RECONNECT_PROBE_INTERVAL = 10
+RECONNECT_PROBE_TIMEOUT = 3
+
+# Seconds an optimistic value is shown without confirmation by homee.
+OPTIMISTIC_TIMEOUT = 10
+
+# Seconds without a new slider value before the last one is sent.
+SLIDER_QUIET_PERIOD = 0.3
+
+# Commands per second sent to homee, and to the nodes of a radio protocol.
+COMMAND_RATE = 20
+PROTOCOL_COMMAND_RATES = {
+    NodeProtocol.ZWAVE: 5,
+    NodeProtocol.ZWAVE_V3: 5,
+    NodeProtocol.ZIG_BEE: 10,
+    NodeProtocol.EN_OCEAN: 2,
+    NodeProtocol.HOMEMATIC: 5,
+    NodeProtocol.KNXRF: 5,
+    NodeProtocol.WMS: 5,
+}
+# Commands that may wait for the nodes of a protocol before new ones fail.
+COMMAND_QUEUE_SIZE = 100
+# Seconds a command waits for an update of its node, before the next command
+# to the node is sent.
+NODE_COMMAND_TIMEOUT = 1
+
+# Command latencies kept for the percentiles, and seconds after which a
+# command is no longer matched with an update of its attribute.
+LATENCY_SAMPLES = 500
+LATENCY_TIMEOUT = 60
+# Percentiles of the command latency shown by the hub sensors.
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# Seconds the refresh_all service waits for all nodes.
+REFRESH_ALL_TIMEOUT = 30
+
+# Seconds refreshes of the same node are collected into one request.
+REFRESH_WINDOW = 0.05
+
+# Seconds updates of homee are collected before the entity states are written.
+STATE_WRITE_DELAY = 0.05
+# Entities written per event loop iteration when the connection changed.
+STATE_WRITE_CHUNK_SIZE = 100
+
+# Sets an attribute type on all nodes of a homee group.
+GROUP_COMMAND = (
+    "PUT:/groups/{group_id}/attributes?target_value={value}"
+    "&attribute_type={attribute_type}"
+)
+
+# Topology snapshot
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+
 # Sensor mappings
 HOMEE_UNIT_TO_HA_UNIT = {
     "": None,
@@ -70,14 +155,89 @@ WINDOW_MAP = {
 WINDOW_MAP_REVERSED = {0.0: "open", 1.0: "closed", 2.0: "tilted"}
 
 # Services
+SERVICE_REFRESH_ALL = "refresh_all"
+SERVICE_SET_COMMAND_OPTIONS = "set_command_options"
+SERVICE_SET_SENSOR_FILTER = "set_sensor_filter"
 SERVICE_SET_VALUE = "set_value"
+# Values of one set_value call that are sent at the same time by default.
+SET_VALUE_MAX_PARALLEL = 10
 
 # Attributes
 ATTR_ATTRIBUTE = "attribute"
 ATTR_CONFIG_ENTRY_ID = "config_entry_id"
 ATTR_HOMEE_DATA = "homee_data"
+ATTR_FORCE = "force"
+ATTR_MAX_PARALLEL = "max_parallel"
 ATTR_NODE = "node"
 ATTR_VALUE = "value"
+ATTR_VALUES = "values"
+
+# Attribute Groups
+NUMBER_ATTRIBUTES = {
+    AttributeType.BUTTON_BRIGHTNESS_ACTIVE,
+    AttributeType.BUTTON_BRIGHTNESS_DIMMED,
+    AttributeType.DISPLAY_BRIGHTNESS_ACTIVE,
+    AttributeType.DISPLAY_BRIGHTNESS_DIMMED,
+    AttributeType.CURRENT_VALVE_POSITION,
+    AttributeType.DOWN_POSITION,
+    AttributeType.DOWN_SLAT_POSITION,
+    AttributeType.DOWN_TIME,
+    AttributeType.ENDPOSITION_CONFIGURATION,
+    AttributeType.EXTERNAL_TEMPERATURE_OFFSET,
+    AttributeType.FLOOR_TEMPERATURE_OFFSET,
+    AttributeType.MOTION_ALARM_CANCELATION_DELAY,
+    AttributeType.OPEN_WINDOW_DETECTION_SENSIBILITY,
+    AttributeType.POLLING_INTERVAL,
+    AttributeType.SHUTTER_SLAT_TIME,
+    AttributeType.SLAT_MAX_ANGLE,
+    AttributeType.SLAT_MIN_ANGLE,
+    AttributeType.SLAT_STEPS,
+    AttributeType.TEMPERATURE_OFFSET,
+    AttributeType.TEMPERATURE_OFFSET,
+    AttributeType.UP_TIME,
+    AttributeType.WAKE_UP_INTERVAL,
+    AttributeType.WIND_MONITORING_STATE,
+}
+SWITCH_ATTRIBUTES = [
+    AttributeType.AUTOMATIC_MODE_IMPULSE,
+    AttributeType.BRIEFLY_OPEN_IMPULSE,
+    AttributeType.EXTERNAL_BINARY_INPUT,
+    AttributeType.IDENTIFICATION_MODE,
+    AttributeType.IMPULSE,
+    AttributeType.LIGHT_IMPULSE,
+    AttributeType.MANUAL_OPERATION,
+    AttributeType.MOTOR_ROTATION,
+    AttributeType.OPEN_PARTIAL_IMPULSE,
+    AttributeType.ON_OFF,
+    AttributeType.PERMANENTLY_OPEN_IMPULSE,
+    AttributeType.RESET_METER,
+    AttributeType.RESTORE_LAST_KNOWN_STATE,
+    AttributeType.SWITCH_TYPE,
+    AttributeType.VENTILATE_IMPULSE,
+    AttributeType.WATCHDOG_ON_OFF,
+]
+# Attributes that trigger an action each time they are set.
+IMPULSE_ATTRIBUTES = {
+    AttributeType.AUTOMATIC_MODE_IMPULSE,
+    AttributeType.BRIEFLY_OPEN_IMPULSE,
+    AttributeType.IMPULSE,
+    AttributeType.LIGHT_IMPULSE,
+    AttributeType.OPEN_PARTIAL_IMPULSE,
+    AttributeType.PERMANENTLY_OPEN_IMPULSE,
+    AttributeType.RESET_METER,
+    AttributeType.SLAT_ROTATION_IMPULSE,
+    AttributeType.VENTILATE_IMPULSE,
+}
+# Attributes set with sliders, whose commands are coalesced per attribute.
+SLIDER_ATTRIBUTES = {
+    *NUMBER_ATTRIBUTES,
+    AttributeType.COLOR,
+    AttributeType.COLOR_TEMPERATURE,
+    AttributeType.DIMMING_LEVEL,
+    AttributeType.POSITION,
+    AttributeType.SHUTTER_SLAT_POSITION,
+    AttributeType.TARGET_TEMPERATURE,
+}
 
 # Profile Groups
 CLIMATE_PROFILES = [
@@ -108,6 +268,42 @@ LIGHT_PROFILES = [
     NodeProfile.WIFI_DIMMABLE_LIGHT,
     NodeProfile.WIFI_ON_OFF_DIMMABLE_METERING_SWITCH,
 ]
+COVER_PROFILES = [
+    NodeProfile.ELECTRIC_MOTOR_METERING_SWITCH,
+    NodeProfile.ELECTRIC_MOTOR_METERING_SWITCH_WITHOUT_SLAT_POSITION,
+    NodeProfile.ENTRANCE_GATE_OPERATOR,
+    NodeProfile.GARAGE_DOOR_OPERATOR,
+    NodeProfile.SHUTTER_POSITION_SWITCH,
+]
+
+# Attributes, that are part of a light or climate entity on nodes with
+# these profiles and therefore don't get an entity of their own.
+NODE_ENTITY_ATTRIBUTES = {
+    AttributeType.ON_OFF: LIGHT_PROFILES,
+    AttributeType.MANUAL_OPERATION: CLIMATE_PROFILES,
+}
+
+# Platforms that are only set up, if the homee has matching attributes or nodes.
+# Sensor and binary sensor entities exist on practically every homee.
+ALWAYS_LOADED_PLATFORMS = {Platform.BINARY_SENSOR, Platform.SENSOR}
+PLATFORM_ATTRIBUTES: dict[Platform, Iterable[AttributeType]] = {
+    Platform.ALARM_CONTROL_PANEL: [AttributeType.HOMEE_MODE],
+    Platform.EVENT: [AttributeType.UP_DOWN_REMOTE],
+    Platform.LOCK: [AttributeType.LOCK_STATE],
+    Platform.NUMBER: NUMBER_ATTRIBUTES,
+    Platform.SELECT: [
+        AttributeType.DISPLAY_TEMPERATURE_SELECTION,
+        AttributeType.REPEATER_MODE,
+    ],
+    Platform.SIREN: [AttributeType.SIREN],
+    Platform.SWITCH: SWITCH_ATTRIBUTES,
+}
+PLATFORM_PROFILES: dict[Platform, Iterable[NodeProfile]] = {
+    Platform.CLIMATE: CLIMATE_PROFILES,
+    Platform.COVER: COVER_PROFILES,
+    Platform.FAN: [NodeProfile.VENTILATION_CONTROL],
+    Platform.LIGHT: LIGHT_PROFILES,
+}
 
 # Climate Presets
 PRESET_COMFORT = "comfort"
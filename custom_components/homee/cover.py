@@ -17,6 +17,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from . import HomeeConfigEntry
+from .const import COVER_PROFILES
 from .entity import HomeeNodeEntity
 from .helpers import migrate_old_unique_ids
 
@@ -83,33 +84,26 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the cover integration."""
 
-    devices: list[HomeeCover] = []
-    devices.extend(
+    devices: list[HomeeCover] = [
         HomeeCover(node, config_entry)
-        for node in config_entry.runtime_data.nodes
-        if is_cover_node(node)
-    )
+        for node in config_entry.runtime_data.index.nodes(*COVER_PROFILES)
+    ]
 
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.COVER)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.COVER)
         async_add_devices(devices)
 
 
 def is_cover_node(node: HomeeNode) -> bool:
     """Determine if a node is controllable as a homee cover based on its profile and attributes."""
-    return node.profile in [
-        NodeProfile.ELECTRIC_MOTOR_METERING_SWITCH,
-        NodeProfile.ELECTRIC_MOTOR_METERING_SWITCH_WITHOUT_SLAT_POSITION,
-        NodeProfile.ENTRANCE_GATE_OPERATOR,
-        NodeProfile.GARAGE_DOOR_OPERATOR,
-        NodeProfile.SHUTTER_POSITION_SWITCH,
-    ]
+    return node.profile in COVER_PROFILES
 
 
 class HomeeCover(HomeeNodeEntity, CoverEntity):
     """Representation of a homee cover device."""
 
     _attr_name = None
+    _optimistic_commands = True
 
     def __init__(self, node: HomeeNode, entry: HomeeConfigEntry) -> None:
         """Initialize a homee cover entity."""
@@ -124,6 +118,11 @@ class HomeeCover(HomeeNodeEntity, CoverEntity):
             if self._open_close_attribute is not None
             else f"{self._attr_unique_id}-0"
         )
+        self.track_attributes(
+            self._open_close_attribute,
+            node.get_attribute_by_type(AttributeType.POSITION),
+            node.get_attribute_by_type(AttributeType.SHUTTER_SLAT_POSITION),
+        )
 
     @property
     def old_unique_id(self) -> str:
@@ -246,7 +245,9 @@ class HomeeCover(HomeeNodeEntity, CoverEntity):
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Stop the cover."""
         if self._open_close_attribute is not None:
-            await self.async_set_value(self._open_close_attribute, 2)
+            await self.async_set_value(
+                self._open_close_attribute, 2, optimistic=False, force=True
+            )
 
     async def async_open_cover_tilt(self, **kwargs: Any) -> None:
         """Open the cover tilt."""
@@ -256,9 +257,9 @@ class HomeeCover(HomeeNodeEntity, CoverEntity):
             )
         ) is not None:
             if not slat_attribute.is_reversed:
-                await self.async_set_value(slat_attribute, 2)
+                await self.async_set_value(slat_attribute, 2, optimistic=False)
             else:
-                await self.async_set_value(slat_attribute, 1)
+                await self.async_set_value(slat_attribute, 1, optimistic=False)
 
     async def async_close_cover_tilt(self, **kwargs: Any) -> None:
         """Close the cover tilt."""
@@ -268,9 +269,9 @@ class HomeeCover(HomeeNodeEntity, CoverEntity):
             )
         ) is not None:
             if not slat_attribute.is_reversed:
-                await self.async_set_value(slat_attribute, 1)
+                await self.async_set_value(slat_attribute, 1, optimistic=False)
             else:
-                await self.async_set_value(slat_attribute, 2)
+                await self.async_set_value(slat_attribute, 2, optimistic=False)
 
     async def async_set_cover_tilt_position(self, **kwargs: Any) -> None:
         """Move the cover tilt to a specific position."""
@@ -0,0 +1,62 @@
+"""Diagnostics for the homee integration."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import HomeeConfigEntry
+from .const import LATENCY_PERCENTILES
+
+TO_REDACT = {CONF_HOST, CONF_PASSWORD, CONF_USERNAME}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: HomeeConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    homee = entry.runtime_data
+    commands = homee.commands
+    latency = commands.latency.node_stats()
+    queue_wait = commands.scheduler.node_stats()
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "settings": {
+            "version": homee.settings.version,
+            "nodes": len(homee.nodes),
+            "groups": len(homee.groups),
+        },
+        "resync": {"resyncs": homee.resyncs, "drift": homee.drift},
+        "commands": {
+            "group_commands_sent": commands.group_commands_sent,
+            "node_commands_saved": commands.node_commands_saved,
+            "confirmations": commands.confirmations,
+            "rollbacks": commands.rollbacks,
+            "slider_values_dropped": commands.slider_values_dropped,
+            "redundant_skipped": commands.redundant_skipped,
+            "latency": {
+                f"p{percent}": commands.latency.percentile(percent)
+                for percent in LATENCY_PERCENTILES
+            },
+            "protocols": commands.scheduler.stats(),
+        },
+        "nodes": {
+            node.id: {
+                "protocol": node.protocol.name.lower(),
+                "latency": latency.get(node.id, {}).get("attributes", {}),
+                "queue_wait": queue_wait.get(node.id, {}),
+            }
+            for node in homee.nodes
+        },
+        "dispatcher": homee.dispatcher.stats(),
+        "state_writes": {
+            "requested": homee.state_writes.requested,
+            "written": homee.state_writes.written,
+            "saved": homee.state_writes.saved,
+            "suppressed": dict(homee.state_writes.suppressed),
+        },
+    }
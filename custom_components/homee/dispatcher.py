@@ -0,0 +1,110 @@
+"""Routing of homee updates to the subscribed entities."""
+
+from collections import Counter
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from pyHomee.model import HomeeAttribute, HomeeNode
+
+from homeassistant.core import callback
+
+type AttributeKey = tuple[int, int]
+
+
+class HomeeDispatcher:
+    """Route each update of homee once to the entities subscribed to it.
+
+    Entities subscribe with the node id and attribute id they show. The hub
+    dispatches every attribute and node update it receives, so there is a
+    single dict lookup per update instead of listener lists per attribute.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the dispatcher."""
+        self._attribute_listeners: dict[
+            AttributeKey, dict[Callable[[HomeeAttribute], None], None]
+        ] = {}
+        self._attributes: dict[AttributeKey, HomeeAttribute] = {}
+        self._node_listeners: dict[int, dict[Callable[[HomeeNode], None], None]] = {}
+        self._nodes: dict[int, HomeeNode] = {}
+        self.updates: Counter[AttributeKey] = Counter()
+        self.fan_out: Counter[AttributeKey] = Counter()
+
+    @callback
+    def async_subscribe_attribute(
+        self, attribute: HomeeAttribute, listener: Callable[[HomeeAttribute], None]
+    ) -> Callable[[], None]:
+        """Call the listener on updates of the attribute."""
+        key = (attribute.node_id, attribute.id)
+        self._attributes[key] = attribute
+        listeners = self._attribute_listeners.setdefault(key, {})
+        listeners[listener] = None
+
+        @callback
+        def remove_listener() -> None:
+            listeners.pop(listener, None)
+            if not listeners and self._attribute_listeners.get(key) is listeners:
+                del self._attribute_listeners[key]
+                del self._attributes[key]
+
+        return remove_listener
+
+    @callback
+    def async_subscribe_node(
+        self, node: HomeeNode, listener: Callable[[HomeeNode], None]
+    ) -> Callable[[], None]:
+        """Call the listener on updates of the node itself."""
+        self._nodes[node.id] = node
+        listeners = self._node_listeners.setdefault(node.id, {})
+        listeners[listener] = None
+
+        @callback
+        def remove_listener() -> None:
+            listeners.pop(listener, None)
+            if not listeners and self._node_listeners.get(node.id) is listeners:
+                del self._node_listeners[node.id]
+                del self._nodes[node.id]
+
+        return remove_listener
+
+    @callback
+    def async_dispatch_attribute(self, node_id: int, attribute_id: int) -> None:
+        """Call the listeners of an updated attribute."""
+        key = (node_id, attribute_id)
+        self.updates[key] += 1
+        if (listeners := self._attribute_listeners.get(key)) is None:
+            return
+
+        self.fan_out[key] += len(listeners)
+        attribute = self._attributes[key]
+        for listener in list(listeners):
+            listener(attribute)
+
+    @callback
+    def async_dispatch_node(
+        self, node_data: dict[str, Any], attribute_ids: Iterable[int] | None = None
+    ) -> None:
+        """Call the listeners of an updated node and of its attributes.
+
+        Without attribute ids, the listeners of all attributes are called.
+        """
+        if (listeners := self._node_listeners.get(node_data["id"])) is not None:
+            node = self._nodes[node_data["id"]]
+            for listener in list(listeners):
+                listener(node)
+
+        if attribute_ids is None:
+            attribute_ids = [attribute["id"] for attribute in node_data["attributes"]]
+        for attribute_id in attribute_ids:
+            self.async_dispatch_attribute(node_data["id"], attribute_id)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return subscribers, updates and fan-out per attribute key."""
+        return {
+            f"{key[0]}-{key[1]}": {
+                "subscribers": len(self._attribute_listeners.get(key, {})),
+                "updates": self.updates[key],
+                "fan_out": self.fan_out[key],
+            }
+            for key in self.updates.keys() | self._attribute_listeners.keys()
+        }
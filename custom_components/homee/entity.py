@@ -1,14 +1,17 @@
 """Base Entities for Homee integration."""
 
+import asyncio
+
 from pyHomee.const import AttributeState, AttributeType, NodeProfile, NodeState
 from pyHomee.model import HomeeAttribute, HomeeNode
 
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import Entity
 
 from . import HomeeConfigEntry
-from .const import DOMAIN
-from .helpers import get_name_for_enum
+from .const import DOMAIN, SLIDER_ATTRIBUTES
+from .helpers import get_name_for_enum, get_skip_redundant_commands
 
 
 class HomeeEntity(Entity):
@@ -16,10 +19,16 @@ class HomeeEntity(Entity):
 
     _attr_has_entity_name = True
     _attr_should_poll = False
+    # Show set values before homee confirms them, if enabled in the options.
+    _optimistic_commands = False
+    # Do not send values homee already has or is already setting, unless
+    # changed in the entity options.
+    _skip_redundant_commands = True
 
     def __init__(self, attribute: HomeeAttribute, entry: HomeeConfigEntry) -> None:
         """Initialize the wrapper using a HomeeAttribute and target entity."""
         self._attribute = attribute
+        self._node = entry.runtime_data.index.node_of(attribute)
         self._attr_unique_id = (
             f"{entry.runtime_data.settings.uid}-{attribute.node_id}-{attribute.id}"
         )
@@ -32,18 +41,14 @@ class HomeeEntity(Entity):
         if attribute.name != "":
             self._attr_name = attribute.name
 
-        self._host_connected = entry.runtime_data.connected
-
     async def async_added_to_hass(self) -> None:
         """Add the homee attribute entity to home assistant."""
         self.async_on_remove(
-            self._attribute.add_on_changed_listener(self._on_attribute_updated)
-        )
-        self.async_on_remove(
-            self._entry.runtime_data.add_connection_listener(
-                self._on_connection_changed
+            self._entry.runtime_data.dispatcher.async_subscribe_attribute(
+                self._attribute, self._on_attribute_updated
             )
         )
+        self.async_on_remove(self._entry.runtime_data.state_writes.async_track(self))
 
     @property
     def extra_state_attributes(self) -> dict | None:
@@ -53,32 +58,33 @@ class HomeeEntity(Entity):
     @property
     def available(self) -> bool:
         """Return the availability of the underlying node."""
-        node = self._entry.runtime_data.get_node_by_id(self._attribute.node_id)
         return (
             (
                 self._attribute.state
                 in [AttributeState.NORMAL, AttributeState.WAITING_FOR_ACKNOWLEDGE]
             )
-            and self._host_connected
-            and node.state == NodeState.AVAILABLE
+            and self._entry.runtime_data.connected
+            and self._node.state == NodeState.AVAILABLE
         )
 
     async def async_set_value(self, value: float) -> None:
         """Set an attribute value on the homee node."""
-        homee = self._entry.runtime_data
-        await homee.set_value(self._attribute.node_id, self._attribute.id, value)
+        await self._entry.runtime_data.commands.async_set_value(
+            self._attribute,
+            value,
+            self._optimistic_commands,
+            force=not get_skip_redundant_commands(self, self._skip_redundant_commands),
+        )
 
     async def async_update(self) -> None:
         """Update entity from homee."""
-        homee = self._entry.runtime_data
-        await homee.update_attribute(self._attribute.node_id, self._attribute.id)
+        await self._entry.runtime_data.commands.async_refresh(
+            self._attribute.node_id, self._attribute.id
+        )
 
+    @callback
     def _on_attribute_updated(self, attribute: HomeeAttribute) -> None:
-        self.schedule_update_ha_state()
-
-    def _on_connection_changed(self, connected: bool) -> None:
-        self._host_connected = connected
-        self.schedule_update_ha_state()
+        self._entry.runtime_data.state_writes.async_schedule(self)
 
 
 class HomeeNodeEntity(Entity):
@@ -86,6 +92,11 @@ class HomeeNodeEntity(Entity):
 
     _attr_has_entity_name = True
     _attr_should_poll = False
+    # Show set values before homee confirms them, if enabled in the options.
+    _optimistic_commands = False
+    # Do not send values homee already has or is already setting, unless
+    # changed in the entity options.
+    _skip_redundant_commands = True
 
     def __init__(self, node: HomeeNode, entry: HomeeConfigEntry) -> None:
         """Initialize the wrapper using a HomeeNode and target entity."""
@@ -107,28 +118,42 @@ class HomeeNodeEntity(Entity):
                 via_device=(DOMAIN, entry.runtime_data.settings.uid),
             )
 
-        self._host_connected = entry.runtime_data.connected
+        # Ids of the attributes the state depends on, None for all attributes.
+        self._tracked_attribute_ids: set[int] | None = None
+        self._node_state = node.state
 
     async def async_added_to_hass(self) -> None:
         """Add the homee binary sensor device to home assistant."""
-        self.async_on_remove(self._node.add_on_changed_listener(self._on_node_updated))
+        dispatcher = self._entry.runtime_data.dispatcher
+        for attribute in self._node.attributes:
+            if (
+                self._tracked_attribute_ids is None
+                or attribute.id in self._tracked_attribute_ids
+            ):
+                self.async_on_remove(
+                    dispatcher.async_subscribe_attribute(
+                        attribute, self._on_attribute_updated
+                    )
+                )
+        self._node_state = self._node.state
         self.async_on_remove(
-            self._entry.runtime_data.add_connection_listener(
-                self._on_connection_changed
-            )
+            dispatcher.async_subscribe_node(self._node, self._on_node_state_updated)
         )
+        self.async_on_remove(self._entry.runtime_data.state_writes.async_track(self))
 
     @property
     def available(self) -> bool:
         """Return the availability of the underlying node."""
-        return self._node.state == NodeState.AVAILABLE and self._host_connected
+        return (
+            self._node.state == NodeState.AVAILABLE
+            and self._entry.runtime_data.connected
+        )
 
     async def async_update(self) -> None:
         """Fetch new state data for this node."""
         # Base class requests the whole node, if only a single attribute is needed
         # the platform will overwrite this method.
-        homee = self._entry.runtime_data
-        await homee.update_node(self._node.id)
+        await self._entry.runtime_data.commands.async_refresh(self._node.id)
 
     def _get_software_version(self) -> str | None:
         """Return the software version of the node."""
@@ -147,6 +172,16 @@ class HomeeNodeEntity(Entity):
 
         return None
 
+    def track_attributes(self, *attributes: HomeeAttribute | None) -> None:
+        """Only write the state on changes of the given attributes.
+
+        Changes of the node state are still written, other attributes of the
+        node, like battery level or link quality, are ignored.
+        """
+        self._tracked_attribute_ids = {
+            attribute.id for attribute in attributes if attribute is not None
+        }
+
     def has_attribute(self, attribute_type: AttributeType) -> bool:
         """Check if an attribute of the given type exists."""
         if self._node.attribute_map is None:
@@ -154,14 +189,55 @@ class HomeeNodeEntity(Entity):
 
         return attribute_type in self._node.attribute_map
 
-    async def async_set_value(self, attribute: HomeeAttribute, value: float) -> None:
+    async def async_set_value(
+        self,
+        attribute: HomeeAttribute,
+        value: float,
+        optimistic: bool | None = None,
+        force: bool = False,
+    ) -> None:
         """Set an attribute value on the homee node."""
-        homee = self._entry.runtime_data
-        await homee.set_value(attribute.node_id, attribute.id, value)
+        await self.async_set_values(
+            (attribute, value), optimistic=optimistic, force=force
+        )
 
-    def _on_node_updated(self, node: HomeeNode) -> None:
-        self.schedule_update_ha_state()
+    async def async_set_values(
+        self,
+        *values: tuple[HomeeAttribute, float],
+        optimistic: bool | None = None,
+        force: bool = False,
+    ) -> None:
+        """Set several attribute values of the node in one burst.
+
+        The commands are queued together and awaited at once, so homee gets
+        them back to back instead of one after another. Values that are
+        commands rather than states, like stopping a cover, must not be shown
+        optimistically and must be sent with force, even if homee already has
+        the value. If one of the values is coalesced like a slider, all of
+        them are, so they still go out together.
+        """
+        if optimistic is None:
+            optimistic = self._optimistic_commands
+        force = force or not get_skip_redundant_commands(
+            self, self._skip_redundant_commands
+        )
+        coalesce = any(attribute.type in SLIDER_ATTRIBUTES for attribute, _ in values)
+        commands = self._entry.runtime_data.commands
+        await asyncio.gather(
+            *(
+                commands.async_set_value(
+                    attribute, value, optimistic, force, coalesce=coalesce
+                )
+                for attribute, value in values
+            )
+        )
 
-    def _on_connection_changed(self, connected: bool) -> None:
-        self._host_connected = connected
-        self.schedule_update_ha_state()
+    @callback
+    def _on_node_state_updated(self, node: HomeeNode) -> None:
+        if node.state != self._node_state:
+            self._node_state = node.state
+            self._entry.runtime_data.state_writes.async_schedule(self)
+
+    @callback
+    def _on_attribute_updated(self, attribute: HomeeAttribute) -> None:
+        self._entry.runtime_data.state_writes.async_schedule(self)
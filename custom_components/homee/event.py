@@ -26,15 +26,14 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the event component."""
 
-    devices: list[HomeeEvent] = []
-    for node in config_entry.runtime_data.nodes:
-        devices.extend(
-            HomeeEvent(attribute, config_entry)
-            for attribute in node.attributes
-            if (attribute.type == AttributeType.UP_DOWN_REMOTE)
+    devices: list[HomeeEvent] = [
+        HomeeEvent(attribute, config_entry)
+        for attribute in config_entry.runtime_data.index.attributes(
+            AttributeType.UP_DOWN_REMOTE
         )
+    ]
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.EVENT)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.EVENT)
         async_add_devices(devices)
 
 
@@ -52,13 +51,11 @@ class HomeeEvent(HomeeEntity, EventEntity):
     async def async_added_to_hass(self) -> None:
         """Add the homee attribute entity to home assistant."""
         self.async_on_remove(
-            self._attribute.add_on_changed_listener(self._event_triggered)
-        )
-        self.async_on_remove(
-            self._entry.runtime_data.add_connection_listener(
-                self._on_connection_changed
+            self._entry.runtime_data.dispatcher.async_subscribe_attribute(
+                self._attribute, self._event_triggered
             )
         )
+        self.async_on_remove(self._entry.runtime_data.state_writes.async_track(self))
 
     @property
     def old_unique_id(self) -> str:
@@ -44,8 +44,9 @@ async def async_setup_entry(
 
     async_add_devices(
         HomeeFan(node, config_entry)
-        for node in config_entry.runtime_data.nodes
-        if node.profile == NodeProfile.VENTILATION_CONTROL
+        for node in config_entry.runtime_data.index.nodes(
+            NodeProfile.VENTILATION_CONTROL
+        )
     )
 
 
@@ -70,6 +71,7 @@ class HomeeFan(HomeeNodeEntity, FanEntity):
         self._mode_attribute: HomeeAttribute | None = node.get_attribute_by_type(
             AttributeType.VENTILATION_MODE
         )
+        self.track_attributes(self._speed_attribute, self._mode_attribute)
         self._attr_supported_features = (
             FanEntityFeature.SET_SPEED | FanEntityFeature.PRESET_MODE
         )
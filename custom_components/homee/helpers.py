@@ -4,10 +4,12 @@ from enum import IntEnum
 import logging
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
 
-from .const import DOMAIN
+from .const import CONF_SKIP_REDUNDANT_COMMANDS, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,20 +24,66 @@ def get_name_for_enum(att_class: type[IntEnum], att_id: int) -> str | None:
     return item.name.lower()
 
 
+def get_skip_redundant_commands(entity: Entity, default: bool) -> bool:
+    """Return if an entity skips values homee already has.
+
+    The default of the entity class can be changed per entity in its entity
+    options, set with the set_command_options service.
+    """
+    if entity.registry_entry is None:
+        return default
+    return entity.registry_entry.options.get(DOMAIN, {}).get(
+        CONF_SKIP_REDUNDANT_COMMANDS, default
+    )
+
+
+@callback
+def get_registered_unique_ids(
+    hass: HomeAssistant, entry_id: str
+) -> dict[tuple[str, str], str]:
+    """Return the entity ids of a config entry indexed by platform and unique id."""
+    registry = er.async_get(hass)
+    unique_ids: dict[tuple[str, str], str] = {}
+    for entity_entry in er.async_entries_for_config_entry(registry, entry_id):
+        unique_id = entity_entry.unique_id
+        # Climate entities had an int unique id in very old versions.
+        if isinstance(unique_id, int):
+            unique_id = f"{unique_id}-climate"
+        unique_ids[(entity_entry.domain, unique_id)] = entity_entry.entity_id
+
+    return unique_ids
+
+
 async def migrate_old_unique_ids(
-    hass: HomeAssistant, devices: list[Any], platform: str
+    hass: HomeAssistant, entry: ConfigEntry, devices: list[Any], platform: str
 ) -> None:
     """Migrate uids for upcoming HA core integration."""
+    # Only set while the config entry has not been migrated yet.
+    if (unique_ids := entry.runtime_data.registered_unique_ids) is None:
+        return
+
     registry = er.async_get(hass)
     for device in devices:
-        old_entity_id = registry.async_get_entity_id(
-            platform, DOMAIN, device.old_unique_id
-        )
+        old_entity_id = unique_ids.get((platform, device.old_unique_id))
         updated_unique_id = device.unique_id
-        if old_entity_id is not None and updated_unique_id is not None:
-            _LOGGER.debug(
-                "Migrating unique_id from [%s] to [%s]",
-                device.old_unique_id,
-                device.unique_id,
+        if old_entity_id is None or updated_unique_id is None:
+            continue
+        # Other homee entries may have the unique id, so look at the domain.
+        if (
+            existing_entity_id := registry.async_get_entity_id(
+                platform, DOMAIN, updated_unique_id
             )
-            registry.async_update_entity(old_entity_id, new_unique_id=updated_unique_id)
+        ) is not None:
+            _LOGGER.error(
+                "Cannot migrate to unique_id '%s', already exists for '%s', "
+                "You may have to delete unavailable homee entities",
+                updated_unique_id,
+                existing_entity_id,
+            )
+            continue
+        _LOGGER.debug(
+            "Migrating unique_id from [%s] to [%s]",
+            device.old_unique_id,
+            device.unique_id,
+        )
+        registry.async_update_entity(old_entity_id, new_unique_id=updated_unique_id)
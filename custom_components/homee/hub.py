@@ -0,0 +1,376 @@
+"""The homee hub connection used as runtime data of the integration."""
+
+import asyncio
+from collections.abc import Callable
+import contextlib
+import logging
+import random
+from typing import Any
+
+from pyHomee import Homee, HomeeAuthFailedException, HomeeConnectionFailedException
+from pyHomee.model import HomeeNode, HomeeSettings
+
+from homeassistant.const import Platform
+from homeassistant.exceptions import HomeAssistantError
+
+from .coalescer import StateWriteCoalescer
+from .commands import HomeeCommands
+from .const import (
+    HOMEE_PORT,
+    RECONNECT_BACKOFF_MAX,
+    RECONNECT_BACKOFF_MIN,
+    RECONNECT_PROBE_INTERVAL,
+    RECONNECT_PROBE_TIMEOUT,
+)
+from .dispatcher import HomeeDispatcher
+from .index import HomeeIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_backoff(attempt: int) -> float:
+    """Return the seconds before a connection attempt, with jitter.
+
+    The delay doubles with every failed attempt, the first retry is fast.
+    """
+    delay = min(RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_MIN * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def get_topology(nodes: list[dict[str, Any]]) -> frozenset:
+    """Return the parts of the node data that define the created entities."""
+    return frozenset(
+        (
+            node["id"],
+            node["profile"],
+            frozenset(
+                (
+                    attribute["id"],
+                    attribute["type"],
+                    attribute["instance"],
+                    attribute["editable"],
+                )
+                for attribute in node["attributes"]
+            ),
+        )
+        for node in nodes
+    )
+
+
+def _without_attributes(node_data: dict[str, Any]) -> dict[str, Any]:
+    """Return the data of a node without its attributes."""
+    return {key: value for key, value in node_data.items() if key != "attributes"}
+
+
+class HomeeHub(Homee):
+    """Homee connection that can be started from a stored topology snapshot."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the hub."""
+        super().__init__(*args, **kwargs)
+        self.index: HomeeIndex = HomeeIndex([])
+        self.platforms: set[Platform] = set()
+        self.commands = HomeeCommands(self)
+        self.dispatcher = HomeeDispatcher()
+        self.state_writes = StateWriteCoalescer()
+        self.registered_unique_ids: dict[tuple[str, str], str] | None = None
+        self.restored: bool = False
+        self.topology_changed: bool = False
+        self._restored_version: str | None = None
+        self._restored_topology: frozenset | None = None
+        self._nodes_added_listeners: list[Callable[[], None]] = []
+        # Attribute data last passed to the entities, to dispatch only changes.
+        self._attribute_data: dict[tuple[int, int], dict[str, Any]] = {}
+        # Node data without attributes, to notice a changed node state.
+        self._node_data: dict[int, dict[str, Any]] = {}
+        self._refresh_all: asyncio.Future[dict[str, int]] | None = None
+        # Attributes that changed while the connection was down.
+        self.resyncs = 0
+        self.drift = 0
+        self._resync_pending = False
+        self._count_drift = False
+        self._was_connected = False
+        self._resynced = asyncio.Event()
+        self._reconnect_attempt = 0
+        self._retry_now = asyncio.Event()
+
+    def build_index(self) -> None:
+        """Classify the current nodes and attributes for the platforms."""
+        self.index = HomeeIndex(self.nodes)
+        # Data of known attributes is kept, it may not be dispatched yet.
+        attribute_data = {}
+        node_data = {}
+        for node in self.nodes:
+            node_data[node.id] = self._node_data.get(
+                node.id, _without_attributes(node.raw_data)
+            )
+            for attribute in node.attributes:
+                key = (attribute.node_id, attribute.id)
+                attribute_data[key] = self._attribute_data.get(key, attribute.raw_data)
+        self._attribute_data = attribute_data
+        self._node_data = node_data
+
+    def restore_snapshot(self, snapshot: dict[str, Any]) -> None:
+        """Populate settings and nodes from a snapshot before connecting."""
+        self.settings = HomeeSettings(snapshot["settings"])
+        self.nodes = [HomeeNode(node_data) for node_data in snapshot["nodes"]]
+        self.restored = True
+        self._restored_version = snapshot["version"]
+        self._restored_topology = get_topology(snapshot["nodes"])
+
+    def as_snapshot(self) -> dict[str, Any]:
+        """Return the current settings and nodes in a storable form."""
+        return {
+            "uid": self.settings.uid,
+            "version": self.settings.version,
+            "settings": self.settings.raw_data,
+            "nodes": [
+                {
+                    **node.raw_data,
+                    "attributes": [attribute.raw_data for attribute in node.attributes],
+                }
+                for node in self.nodes
+            ],
+        }
+
+    async def run_when_reachable(self) -> None:
+        """Keep the connection to homee up until it is closed.
+
+        Failed and lost connections are retried with exponential backoff and
+        jitter, without a retry limit. Setup does not fail if homee is
+        unreachable in the background connect mode, so this also covers the
+        first connection.
+        """
+        auth_failed = False
+        while not self.should_close:
+            unreachable = False
+            try:
+                await self.get_access_token()
+            except HomeeConnectionFailedException as exc:
+                _LOGGER.debug("homee at %s not reachable: %s", self.host, exc)
+                unreachable = True
+            except HomeeAuthFailedException as exc:
+                # pyHomee also raises this for any error reply, e.g. while homee
+                # boots, so it is retried, but only reported once.
+                if not auth_failed:
+                    _LOGGER.warning(
+                        "Authentication to homee at %s failed, reconfigure the "
+                        "integration if the credentials changed: %s",
+                        self.host,
+                        exc,
+                    )
+                    auth_failed = True
+                else:
+                    _LOGGER.debug("Authentication to homee failed: %s", exc)
+            else:
+                auth_failed = False
+                await self.open_ws()
+            if self.should_close:
+                return
+
+            delay = get_backoff(self._reconnect_attempt)
+            self._reconnect_attempt += 1
+            _LOGGER.debug(
+                "Connecting to homee at %s again in %.1f seconds", self.host, delay
+            )
+            await self._async_wait_for_retry(delay, probe=unreachable)
+
+    async def _async_wait_for_retry(self, delay: float, probe: bool = False) -> None:
+        """Wait for the next connection attempt.
+
+        If homee was not reachable, it is probed in between, so a hub that is
+        back after a reboot is connected right away instead of after the full
+        delay. Other failures, like a rejected websocket, wait the full delay,
+        as homee accepting connections does not tell they are solved.
+        """
+        self._retry_now.clear()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + delay
+        while not self.should_close and (remaining := deadline - loop.time()) > 0:
+            if probe:
+                remaining = min(remaining, RECONNECT_PROBE_INTERVAL)
+            try:
+                async with asyncio.timeout(remaining):
+                    await self._retry_now.wait()
+            except TimeoutError:
+                pass
+            else:
+                return
+            if probe and deadline - loop.time() > 0 and await self.async_probe():
+                _LOGGER.debug("homee at %s is reachable again", self.host)
+                return
+
+    async def async_probe(self) -> bool:
+        """Return if the port of homee accepts connections."""
+        try:
+            async with asyncio.timeout(RECONNECT_PROBE_TIMEOUT):
+                _, writer = await asyncio.open_connection(self.host, HOMEE_PORT)
+        except (OSError, TimeoutError):
+            return False
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+        return True
+
+    def retry_now(self) -> None:
+        """Start the next connection attempt without waiting for the backoff."""
+        self._retry_now.set()
+
+    def disconnect(self) -> None:
+        """Close the connection and stop reconnecting."""
+        super().disconnect()
+        self._retry_now.set()
+
+    async def on_connected(self) -> None:
+        """Resync with the node dump homee sends after connecting."""
+        self._reconnect_attempt = 0
+        self._resync_pending = True
+        # Without earlier node data, there is nothing to drift from.
+        self._count_drift = self._was_connected or self.restored
+        self._was_connected = True
+        self._resynced.clear()
+        await super().on_connected()
+
+    async def async_wait_resynced(self) -> None:
+        """Wait until the node dump after connecting was applied."""
+        await self._resynced.wait()
+
+    async def on_disconnected(self, error: Exception | None = None) -> None:
+        """Fail a pending refresh, as homee will not answer it anymore."""
+        if self._refresh_all is not None:
+            self._refresh_all.set_exception(
+                HomeAssistantError("Disconnected from homee")
+            )
+            self._refresh_all = None
+        await super().on_disconnected(error)
+
+    async def async_refresh_all(self) -> dict[str, int]:
+        """Request all nodes and return the counts of the applied changes."""
+        if not self.connected:
+            # pyHomee drops messages while disconnected.
+            raise HomeAssistantError("Not connected to homee")
+        if (refresh := self._refresh_all) is None:
+            refresh = self._refresh_all = asyncio.get_running_loop().create_future()
+            await self.send("GET:all")
+        try:
+            return await asyncio.shield(refresh)
+        except asyncio.CancelledError:
+            # Let the next call request the nodes again, e.g. after a timeout.
+            if self._refresh_all is refresh:
+                self._refresh_all = None
+            raise
+
+    def add_nodes_added_listener(
+        self, listener: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Add a listener that is called when homee reports new nodes."""
+        self._nodes_added_listeners.append(listener)
+
+        def remove_listener() -> None:
+            self._nodes_added_listeners.remove(listener)
+
+        return remove_listener
+
+    async def on_attribute_updated(
+        self, attribute_data: dict[str, Any], node: HomeeNode
+    ) -> None:
+        """Pass an attribute update to the subscribed entities."""
+        self._attribute_data[(node.id, attribute_data["id"])] = attribute_data
+        self.commands.latency.async_echo(node.id, attribute_data["id"])
+        self.commands.scheduler.async_node_updated(node.id)
+        self.commands.async_attribute_received(node.id, attribute_data["id"])
+        self.dispatcher.async_dispatch_attribute(node.id, attribute_data["id"])
+
+    async def on_message(self, msg: dict) -> None:
+        """Reconcile the known nodes with node data sent by homee."""
+        if "all" in msg and self.restored:
+            self._reconcile_snapshot(msg["all"]["nodes"])
+
+        # Attribute messages are dispatched by on_attribute_updated.
+        if "all" in msg:
+            nodes_data = msg["all"]["nodes"]
+        elif "nodes" in msg:
+            nodes_data = msg["nodes"]
+        elif "node" in msg:
+            nodes_data = [msg["node"]]
+        else:
+            nodes_data = []
+        changed = self._apply_nodes(nodes_data)
+
+        if "all" in msg and self._resync_pending:
+            self._resync_pending = False
+            if self._count_drift:
+                self.resyncs += 1
+                self.drift += changed
+            if self._count_drift and changed:
+                _LOGGER.info(
+                    "%s attributes of homee %s changed while disconnected",
+                    changed,
+                    self.settings.uid,
+                )
+            self._resynced.set()
+
+        if "all" in msg and self._refresh_all is not None:
+            self._refresh_all.set_result(
+                {
+                    "nodes": len(nodes_data),
+                    "attributes": sum(
+                        len(node_data["attributes"]) for node_data in nodes_data
+                    ),
+                    "changed_attributes": changed,
+                }
+            )
+            self._refresh_all = None
+
+        if ("all" in msg or "node" in msg or "nodes" in msg) and any(
+            not self.index.has_node(node.id) for node in self.nodes
+        ):
+            self.build_index()
+            for listener in self._nodes_added_listeners:
+                listener()
+
+    def _apply_nodes(self, nodes_data: list[dict[str, Any]]) -> int:
+        """Pass the attributes that changed to the entities and count them.
+
+        pyHomee already updated the nodes, so the received data is compared
+        with the data last passed to the entities. All attributes of a node
+        are passed on when the node itself changed, like its availability.
+        """
+        changed = 0
+        for node_data in nodes_data:
+            node_id = node_data["id"]
+            self.commands.scheduler.async_node_updated(node_id)
+            changed_ids = []
+            for attribute_data in node_data["attributes"]:
+                key = (node_id, attribute_data["id"])
+                optimistic = self.commands.is_optimistic(*key)
+                self.commands.async_attribute_received(*key)
+                if optimistic or self._attribute_data.get(key) != attribute_data:
+                    self._attribute_data[key] = attribute_data
+                    changed_ids.append(attribute_data["id"])
+            changed += len(changed_ids)
+            node_state = _without_attributes(node_data)
+            if self._node_data.get(node_id) != node_state:
+                self._node_data[node_id] = node_state
+                self.dispatcher.async_dispatch_node(node_data)
+            else:
+                self.dispatcher.async_dispatch_node(node_data, changed_ids)
+        return changed
+
+    def _reconcile_snapshot(self, nodes_data: list[dict[str, Any]]) -> None:
+        """Drop restored nodes that are gone and check for topology changes."""
+        # pyHomee updates restored nodes in place, but keeps nodes that are gone.
+        live_ids = {node_data["id"] for node_data in nodes_data}
+        if any(node.id not in live_ids for node in self.nodes):
+            self.nodes = [node for node in self.nodes if node.id in live_ids]
+            self.build_index()
+
+        if (
+            self.settings.version != self._restored_version
+            or get_topology(nodes_data) != self._restored_topology
+        ):
+            _LOGGER.info(
+                "Topology of homee %s changed since the last snapshot",
+                self.settings.uid,
+            )
+            self.topology_changed = True
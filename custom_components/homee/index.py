@@ -0,0 +1,82 @@
+"""Index of the homee nodes and attributes shared by all platforms."""
+
+from collections import defaultdict
+
+from pyHomee.const import AttributeType, NodeProfile
+from pyHomee.model import HomeeAttribute, HomeeNode
+
+from homeassistant.const import Platform
+
+from .const import (
+    ALWAYS_LOADED_PLATFORMS,
+    NODE_ENTITY_ATTRIBUTES,
+    PLATFORM_ATTRIBUTES,
+    PLATFORM_PROFILES,
+)
+
+
+class HomeeIndex:
+    """Nodes and attributes of a homee, bucketed by type in a single pass."""
+
+    def __init__(self, nodes: list[HomeeNode]) -> None:
+        """Build the index from the nodes of a homee."""
+        self._nodes: dict[NodeProfile, list[HomeeNode]] = defaultdict(list)
+        self._attributes: dict[AttributeType, list[HomeeAttribute]] = defaultdict(list)
+        self._node_by_id: dict[int, HomeeNode] = {}
+        self._attribute_by_id: dict[tuple[int, int], HomeeAttribute] = {}
+
+        for node in nodes:
+            self._node_by_id[node.id] = node
+            self._nodes[node.profile].append(node)
+            for attribute in node.attributes:
+                self._attributes[attribute.type].append(attribute)
+                self._attribute_by_id[(node.id, attribute.id)] = attribute
+
+    def nodes(self, *profiles: NodeProfile) -> list[HomeeNode]:
+        """Return all nodes with one of the given profiles."""
+        return [node for profile in profiles for node in self._nodes.get(profile, [])]
+
+    def attributes(self, *attribute_types: AttributeType) -> list[HomeeAttribute]:
+        """Return all attributes of the given types."""
+        return [
+            attribute
+            for attribute_type in attribute_types
+            for attribute in self._attributes.get(attribute_type, [])
+        ]
+
+    def get_attribute(self, node_id: int, attribute_id: int) -> HomeeAttribute | None:
+        """Return the attribute with the given ids, if it is known."""
+        return self._attribute_by_id.get((node_id, attribute_id))
+
+    def has_node(self, node_id: int) -> bool:
+        """Return if the node with the given id is part of the index."""
+        return node_id in self._node_by_id
+
+    def platforms(self) -> set[Platform]:
+        """Return the platforms that may have entities for the indexed nodes."""
+        platforms = set(ALWAYS_LOADED_PLATFORMS)
+        platforms.update(
+            platform
+            for platform, attribute_types in PLATFORM_ATTRIBUTES.items()
+            if any(self._attributes.get(t) for t in attribute_types)
+        )
+        platforms.update(
+            platform
+            for platform, profiles in PLATFORM_PROFILES.items()
+            if any(self._nodes.get(profile) for profile in profiles)
+        )
+        return platforms
+
+    def node_of(self, attribute: HomeeAttribute) -> HomeeNode:
+        """Return the node an attribute belongs to."""
+        return self._node_by_id[attribute.node_id]
+
+    def is_node_entity_attribute(self, attribute: HomeeAttribute) -> bool:
+        """Return if the attribute is represented by an entity of its node.
+
+        Lights and climate entities use those attributes, so they must not
+        get an entity of their own.
+        """
+        return self.node_of(attribute).profile in NODE_ENTITY_ATTRIBUTES.get(
+            attribute.type, ()
+        )
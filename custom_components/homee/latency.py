@@ -0,0 +1,93 @@
+"""Round-trip latency of the commands sent to homee."""
+
+from collections import deque
+from collections.abc import Callable
+import math
+import time
+from typing import Any
+
+from pyHomee.const import AttributeType, NodeProtocol
+from pyHomee.model import HomeeAttribute
+
+from homeassistant.core import callback
+
+from .const import LATENCY_SAMPLES, LATENCY_TIMEOUT
+
+type LatencyKey = tuple[int, NodeProtocol, AttributeType]
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of sorted samples."""
+    rank = math.ceil(percent / 100 * len(samples))
+    return samples[min(max(rank - 1, 0), len(samples) - 1)]
+
+
+class CommandLatency:
+    """Time from sending a command until homee echoes the attribute.
+
+    The first update of an attribute after a command is taken as its echo.
+    The last samples are kept per node, protocol and attribute type.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the latency tracking."""
+        self._sent: dict[tuple[int, int], tuple[float, LatencyKey]] = {}
+        self._samples: dict[LatencyKey, deque[float]] = {}
+        self._recent: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._listeners: list[Callable[[], None]] = []
+
+    @callback
+    def async_sent(self, attribute: HomeeAttribute, protocol: NodeProtocol) -> None:
+        """Start timing a command to an attribute."""
+        self._sent[(attribute.node_id, attribute.id)] = (
+            time.monotonic(),
+            (attribute.node_id, protocol, attribute.type),
+        )
+
+    @callback
+    def async_echo(self, node_id: int, attribute_id: int) -> None:
+        """Stop timing the command to an attribute that homee updated."""
+        if (sent := self._sent.pop((node_id, attribute_id), None)) is None:
+            return
+
+        start, key = sent
+        if (latency := time.monotonic() - start) > LATENCY_TIMEOUT:
+            return
+
+        self._samples.setdefault(key, deque(maxlen=LATENCY_SAMPLES)).append(latency)
+        self._recent.append(latency)
+        for listener in self._listeners:
+            listener()
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call the listener when a new sample was taken."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile of the recent latencies of all commands."""
+        if not self._recent:
+            return None
+        return percentile(sorted(self._recent), percent)
+
+    def node_stats(self) -> dict[int, dict[str, Any]]:
+        """Return the latency percentiles per node and attribute type."""
+        stats: dict[int, dict[str, Any]] = {}
+        for (node_id, protocol, attribute_type), samples in self._samples.items():
+            ordered = sorted(samples)
+            node_stats = stats.setdefault(
+                node_id, {"protocol": protocol.name.lower(), "attributes": {}}
+            )
+            node_stats["attributes"][attribute_type.name.lower()] = {
+                "samples": len(ordered),
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+            }
+        return stats
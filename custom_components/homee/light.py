@@ -94,20 +94,23 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the light integration."""
 
-    devices: list[HomeeLight] = []
-    for node in config_entry.runtime_data.nodes:
-        if is_light_node(node):
-            light_set = get_light_attribute_sets(node)
-            devices.extend(HomeeLight(node, light, config_entry) for light in light_set)
+    devices: list[HomeeLight] = [
+        HomeeLight(node, light, config_entry)
+        for node in config_entry.runtime_data.index.nodes(*LIGHT_PROFILES)
+        if is_light_node(node)
+        for light in get_light_attribute_sets(node)
+    ]
 
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.LIGHT)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.LIGHT)
         async_add_devices(devices)
 
 
 class HomeeLight(HomeeNodeEntity, LightEntity):
     """Representation of a Homee light."""
 
+    _optimistic_commands = True
+
     def __init__(
         self,
         node: HomeeNode,
@@ -126,6 +129,13 @@ class HomeeLight(HomeeNodeEntity, LightEntity):
             AttributeType.COLOR_TEMPERATURE
         )
         self._mode_attr: HomeeAttribute | None = light.get(AttributeType.COLOR_MODE)
+        self.track_attributes(
+            self._on_off_attr,
+            self._dimmer_attr,
+            self._col_attr,
+            self._temp_attr,
+            self._mode_attr,
+        )
 
         self._attr_supported_color_modes = self._get_supported_color_modes()
         self._attr_color_mode = get_color_mode(self._attr_supported_color_modes)
@@ -181,6 +191,7 @@ class HomeeLight(HomeeNodeEntity, LightEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Instruct the light to turn on."""
+        values: list[tuple[HomeeAttribute, float]] = []
         if ATTR_BRIGHTNESS in kwargs and self._dimmer_attr is not None:
             target_value = round(
                 brightness_to_value(
@@ -188,21 +199,24 @@ class HomeeLight(HomeeNodeEntity, LightEntity):
                     kwargs[ATTR_BRIGHTNESS],
                 )
             )
-            await self.async_set_value(self._dimmer_attr, target_value)
+            values.append((self._dimmer_attr, target_value))
         else:
             # If no brightness value is given, just turn on.
-            await self.async_set_value(self._on_off_attr, 1)
+            values.append((self._on_off_attr, 1))
 
         if ATTR_COLOR_TEMP_KELVIN in kwargs and self._temp_attr is not None:
-            await self.async_set_value(self._temp_attr, kwargs[ATTR_COLOR_TEMP_KELVIN])
+            values.append((self._temp_attr, kwargs[ATTR_COLOR_TEMP_KELVIN]))
         if ATTR_HS_COLOR in kwargs:
             color = kwargs[ATTR_HS_COLOR]
             if self._col_attr is not None:
-                await self.async_set_value(
-                    self._col_attr,
-                    rgb_list_to_decimal(color_hs_to_RGB(*color)),
+                values.append(
+                    (self._col_attr, rgb_list_to_decimal(color_hs_to_RGB(*color)))
                 )
 
+        # Send all values at once, so the light does not flicker through
+        # intermediate states.
+        await self.async_set_values(*values)
+
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Instruct the light to turn off."""
         await self.async_set_value(self._on_off_attr, 0)
@@ -21,15 +21,15 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the lock component."""
 
-    devices: list[HomeeLock] = []
-    for node in config_entry.runtime_data.nodes:
-        devices.extend(
-            HomeeLock(attribute, config_entry)
-            for attribute in node.attributes
-            if (attribute.type == AttributeType.LOCK_STATE and attribute.editable)
+    devices: list[HomeeLock] = [
+        HomeeLock(attribute, config_entry)
+        for attribute in config_entry.runtime_data.index.attributes(
+            AttributeType.LOCK_STATE
         )
+        if attribute.editable
+    ]
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.LOCK)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.LOCK)
         async_add_devices(devices)
 
 
@@ -37,6 +37,7 @@ class HomeeLock(HomeeEntity, LockEntity):
     """Representation of a homee lock."""
 
     _attr_name = None
+    _optimistic_commands = True
 
     @property
     def old_unique_id(self) -> str:
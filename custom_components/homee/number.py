@@ -9,38 +9,12 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ServiceValidationError
 
 from . import HomeeConfigEntry
-from .const import DOMAIN
+from .const import DOMAIN, NUMBER_ATTRIBUTES
 from .entity import HomeeEntity
 from .helpers import migrate_old_unique_ids
 
 PARALLEL_UPDATES = 0
 
-NUMBER_ATTRIBUTES = {
-    AttributeType.BUTTON_BRIGHTNESS_ACTIVE,
-    AttributeType.BUTTON_BRIGHTNESS_DIMMED,
-    AttributeType.DISPLAY_BRIGHTNESS_ACTIVE,
-    AttributeType.DISPLAY_BRIGHTNESS_DIMMED,
-    AttributeType.CURRENT_VALVE_POSITION,
-    AttributeType.DOWN_POSITION,
-    AttributeType.DOWN_SLAT_POSITION,
-    AttributeType.DOWN_TIME,
-    AttributeType.ENDPOSITION_CONFIGURATION,
-    AttributeType.EXTERNAL_TEMPERATURE_OFFSET,
-    AttributeType.FLOOR_TEMPERATURE_OFFSET,
-    AttributeType.MOTION_ALARM_CANCELATION_DELAY,
-    AttributeType.OPEN_WINDOW_DETECTION_SENSIBILITY,
-    AttributeType.POLLING_INTERVAL,
-    AttributeType.SHUTTER_SLAT_TIME,
-    AttributeType.SLAT_MAX_ANGLE,
-    AttributeType.SLAT_MIN_ANGLE,
-    AttributeType.SLAT_STEPS,
-    AttributeType.TEMPERATURE_OFFSET,
-    AttributeType.TEMPERATURE_OFFSET,
-    AttributeType.UP_TIME,
-    AttributeType.WAKE_UP_INTERVAL,
-    AttributeType.WIND_MONITORING_STATE,
-}
-
 
 def get_device_properties(attribute: HomeeAttribute):
     """Determinde the device properties based on the attribute."""
@@ -152,15 +126,13 @@ async def async_setup_entry(
 ):
     """Add the homee platform for the number components."""
 
-    devices = []
-    for node in config_entry.runtime_data.nodes:
-        devices.extend(
-            HomeeNumber(attribute, config_entry)
-            for attribute in node.attributes
-            if attribute.type in NUMBER_ATTRIBUTES and attribute.data != "fixed_value"
-        )
+    devices = [
+        HomeeNumber(attribute, config_entry)
+        for attribute in config_entry.runtime_data.index.attributes(*NUMBER_ATTRIBUTES)
+        if attribute.data != "fixed_value"
+    ]
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.NUMBER)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.NUMBER)
         async_add_devices(devices)
 
 
@@ -220,9 +192,7 @@ class HomeeNumber(HomeeEntity, NumberEntity):
     async def async_set_native_value(self, value: float) -> None:
         """Update the current value."""
         if self._attribute.editable:
-            await self._entry.runtime_data.set_value(
-                self._attribute.node_id, self._attribute.id, value
-            )
+            await self.async_set_value(value)
         else:
             raise ServiceValidationError(
                 translation_domain=DOMAIN,
@@ -0,0 +1,176 @@
+"""Pacing of the commands sent to homee."""
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+import time
+from typing import Any
+
+from pyHomee.const import NodeProtocol
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import (
+    COMMAND_QUEUE_SIZE,
+    COMMAND_RATE,
+    NODE_COMMAND_TIMEOUT,
+    PROTOCOL_COMMAND_RATES,
+)
+
+
+class CommandQueueFullError(HomeAssistantError):
+    """Error to indicate that too many commands wait for a protocol."""
+
+
+class CommandScheduler:
+    """Send commands at a global and a per-protocol rate.
+
+    Every command gets the next free send slot of the hub and of the radio
+    protocol of its node, so a burst is spread out instead of flooding the
+    hub. Commands beyond the queue size of a protocol are rejected.
+
+    Commands to one node are paced by homee: a command waits until homee
+    reported an update of the node for the previous burst of commands, or
+    for the node timeout. Commands that arrive together, like the values of
+    one entity call, go out as one burst.
+    """
+
+    def __init__(
+        self,
+        rate: float = COMMAND_RATE,
+        protocol_rates: dict[NodeProtocol, float] = PROTOCOL_COMMAND_RATES,
+        queue_size: int = COMMAND_QUEUE_SIZE,
+        node_timeout: float = NODE_COMMAND_TIMEOUT,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.rate = rate
+        self.protocol_rates = protocol_rates
+        self.queue_size = queue_size
+        self.node_timeout = node_timeout
+        self._next_slot = 0.0
+        self._next_protocol_slot: dict[NodeProtocol | None, float] = {}
+        self.depth: Counter[NodeProtocol | None] = Counter()
+        self.max_depth: Counter[NodeProtocol | None] = Counter()
+        self.sent: Counter[NodeProtocol | None] = Counter()
+        self.rejected: Counter[NodeProtocol | None] = Counter()
+        self.wait: Counter[NodeProtocol | None] = Counter()
+        self.max_wait: Counter[NodeProtocol | None] = Counter()
+        self._node_updates: dict[int, asyncio.Event] = {}
+        self._node_bursts: set[int] = set()
+        self.node_sent: Counter[int] = Counter()
+        self.node_wait: Counter[int] = Counter()
+        self.node_max_wait: Counter[int] = Counter()
+        self.node_timeouts: Counter[int] = Counter()
+
+    async def async_run(
+        self,
+        protocol: NodeProtocol | None,
+        send: Callable[[], Awaitable[Any]],
+        node_id: int | None = None,
+    ) -> None:
+        """Wait for the node and the next send slot of the protocol, then send.
+
+        Commands to the same node wait for homee to process the previous
+        burst, while commands to other nodes do not wait for them. Commands
+        without a protocol, like group commands, are only paced by the global
+        rate.
+        """
+        if self.depth[protocol] >= self.queue_size:
+            self.rejected[protocol] += 1
+            raise CommandQueueFullError(
+                f"Too many commands waiting for {_protocol_name(protocol)} nodes"
+            )
+
+        self.depth[protocol] += 1
+        self.max_depth[protocol] = max(self.max_depth[protocol], self.depth[protocol])
+        try:
+            if node_id is not None:
+                await self._async_wait_for_node(node_id)
+            await self._async_send_in_slot(protocol, send)
+        finally:
+            self.depth[protocol] -= 1
+
+    async def _async_wait_for_node(self, node_id: int) -> None:
+        """Wait until homee processed the previous burst of commands to a node.
+
+        Commands arriving in the same event loop iteration as the first one
+        of a burst join it, so HA's concurrent entity calls are not split.
+        """
+        start = time.monotonic()
+        while (
+            node_id not in self._node_bursts
+            and (updated := self._node_updates.get(node_id)) is not None
+        ):
+            try:
+                await asyncio.wait_for(updated.wait(), self.node_timeout)
+            except TimeoutError:
+                if self._node_updates.get(node_id) is updated:
+                    self.node_timeouts[node_id] += 1
+                    del self._node_updates[node_id]
+
+        if node_id not in self._node_bursts:
+            self._node_updates[node_id] = asyncio.Event()
+            self._node_bursts.add(node_id)
+            asyncio.get_running_loop().call_soon(self._node_bursts.discard, node_id)
+
+        node_wait = time.monotonic() - start
+        self.node_sent[node_id] += 1
+        self.node_wait[node_id] += node_wait
+        self.node_max_wait[node_id] = max(self.node_max_wait[node_id], node_wait)
+
+    @callback
+    def async_node_updated(self, node_id: int) -> None:
+        """Let the next commands to a node go, as homee reported an update."""
+        if (updated := self._node_updates.pop(node_id, None)) is not None:
+            updated.set()
+
+    async def _async_send_in_slot(
+        self, protocol: NodeProtocol | None, send: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Wait for the next send slot of the protocol, then send."""
+        now = time.monotonic()
+        slot = max(now, self._next_slot, self._next_protocol_slot.get(protocol, 0))
+        self._next_slot = slot + 1 / self.rate
+        if (protocol_rate := self.protocol_rates.get(protocol)) is not None:
+            self._next_protocol_slot[protocol] = slot + 1 / protocol_rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+        self.wait[protocol] += slot - now
+        self.max_wait[protocol] = max(self.max_wait[protocol], slot - now)
+        self.sent[protocol] += 1
+        await send()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Return queue depth and wait times per protocol."""
+        return {
+            _protocol_name(protocol): {
+                "queue_depth": self.depth[protocol],
+                "max_queue_depth": self.max_depth[protocol],
+                "sent": self.sent[protocol],
+                "rejected": self.rejected[protocol],
+                "mean_wait": self.wait[protocol] / self.sent[protocol]
+                if self.sent[protocol]
+                else 0.0,
+                "max_wait": self.max_wait[protocol],
+            }
+            for protocol in self.sent.keys() | self.depth.keys() | self.rejected.keys()
+        }
+
+    def node_stats(self) -> dict[int, dict[str, float]]:
+        """Return the time commands waited for earlier commands per node."""
+        return {
+            node_id: {
+                "sent": sent,
+                "mean_wait": self.node_wait[node_id] / sent,
+                "max_wait": self.node_max_wait[node_id],
+                "timeouts": self.node_timeouts[node_id],
+            }
+            for node_id, sent in self.node_sent.items()
+        }
+
+
+def _protocol_name(protocol: NodeProtocol | None) -> str:
+    """Return a readable name of a protocol."""
+    return "group" if protocol is None else protocol.name.lower()
@@ -34,11 +34,12 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the cover integration."""
 
+    index = config_entry.runtime_data.index
     async_add_entities(
-        HomeeSelect(attribute, config_entry, SELECT_DESCRIPTIONS[attribute.type])
-        for node in config_entry.runtime_data.nodes
-        for attribute in node.attributes
-        if attribute.type in SELECT_DESCRIPTIONS and attribute.editable
+        HomeeSelect(attribute, config_entry, description)
+        for attribute_type, description in SELECT_DESCRIPTIONS.items()
+        for attribute in index.attributes(attribute_type)
+        if attribute.editable
     )
 
 
@@ -2,9 +2,12 @@
 
 from collections.abc import Callable
 from dataclasses import dataclass
+import time
+from typing import Any
 
 from pyHomee.const import AttributeType, NodeProtocol, NodeState
 from pyHomee.model import HomeeAttribute, HomeeNode
+import voluptuous as vol
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -12,15 +15,28 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import EntityCategory, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, Platform, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_platform, entity_registry as er
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 
 from . import HomeeConfigEntry
 from .const import (
+    CONF_DEADBAND,
+    CONF_MIN_INTERVAL,
+    CONF_RELATIVE_DEADBAND,
+    CONF_SENSOR_FILTER,
+    DEADBAND_FLUSH_INTERVAL,
+    DOMAIN,
     HOMEE_UNIT_TO_HA_UNIT,
+    LATENCY_PERCENTILES,
     OPEN_CLOSE_MAP,
     OPEN_CLOSE_MAP_REVERSED,
+    SERVICE_SET_SENSOR_FILTER,
     WINDOW_MAP,
     WINDOW_MAP_REVERSED,
 )
@@ -63,6 +79,13 @@ class HomeeSensorEntityDescription(SensorEntityDescription):
         lambda homee_unit: HOMEE_UNIT_TO_HA_UNIT[homee_unit]
     )
     is_also_number: bool = False
+    # Publish filter used if the sensor filter option is enabled.
+    # Minimum seconds between two published values.
+    min_interval: float = 0
+    # Changes smaller than the absolute deadband or the relative deadband
+    # (a fraction of the published value) are published with a delay.
+    deadband: float = 0
+    relative_deadband: float = 0
 
 
 SENSOR_DESCRIPTIONS: dict[AttributeType, HomeeSensorEntityDescription] = {
@@ -92,11 +115,15 @@ SENSOR_DESCRIPTIONS: dict[AttributeType, HomeeSensorEntityDescription] = {
         key="current",
         device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
+        min_interval=5,
+        relative_deadband=0.02,
     ),
     AttributeType.CURRENT_ENERGY_USE: HomeeSensorEntityDescription(
         key="power",
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
+        min_interval=5,
+        relative_deadband=0.02,
     ),
     AttributeType.CURRENT_VALVE_POSITION: HomeeSensorEntityDescription(
         key="valve_position",
@@ -207,16 +234,22 @@ SENSOR_DESCRIPTIONS: dict[AttributeType, HomeeSensorEntityDescription] = {
         key="total_current",
         device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
+        min_interval=5,
+        relative_deadband=0.02,
     ),
     AttributeType.TOTAL_CURRENT_ENERGY_USE: HomeeSensorEntityDescription(
         key="total_power",
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
+        min_interval=5,
+        relative_deadband=0.02,
     ),
     AttributeType.TOTAL_VOLTAGE: HomeeSensorEntityDescription(
         key="total_voltage",
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
+        min_interval=5,
+        deadband=1,
     ),
     AttributeType.UP_DOWN: HomeeSensorEntityDescription(
         key="up_down",
@@ -238,6 +271,8 @@ SENSOR_DESCRIPTIONS: dict[AttributeType, HomeeSensorEntityDescription] = {
         key="voltage",
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
+        min_interval=5,
+        deadband=1,
     ),
     AttributeType.WAKE_UP_INTERVAL: HomeeSensorEntityDescription(
         key="wake_up_interval",
@@ -308,35 +343,66 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the sensor components."""
 
-    devices: list[HomeeSensor | HomeeNodeSensor] = []
-    for node in config_entry.runtime_data.nodes:
-        # Node properties that are sensors.
-        devices.extend(
-            HomeeNodeSensor(node, config_entry, description)
-            for description in NODE_SENSOR_DESCRIPTIONS
-        )
-
-        # Node attributes that are sensors.
-        devices.extend(
-            HomeeSensor(attribute, config_entry, SENSOR_DESCRIPTIONS[attribute.type])
-            for attribute in node.attributes
-            if attribute.type in SENSOR_DESCRIPTIONS
-            and (
-                (
-                    not attribute.editable
-                    and not SENSOR_DESCRIPTIONS[attribute.type].is_also_number
-                )
-                or (
-                    SENSOR_DESCRIPTIONS[attribute.type].is_also_number
-                    and attribute.data == "fixed_value"
-                )
-            )
-        )
+    # Node properties that are sensors.
+    devices: list[HomeeSensor | HomeeNodeSensor] = [
+        HomeeNodeSensor(node, config_entry, description)
+        for node in config_entry.runtime_data.nodes
+        for description in NODE_SENSOR_DESCRIPTIONS
+    ]
+
+    # Node attributes that are sensors.
+    index = config_entry.runtime_data.index
+    devices.extend(
+        HomeeSensor(attribute, config_entry, description)
+        for attribute_type, description in SENSOR_DESCRIPTIONS.items()
+        for attribute in index.attributes(attribute_type)
+        if (not attribute.editable and not description.is_also_number)
+        or (description.is_also_number and attribute.data == "fixed_value")
+    )
 
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.SENSOR)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.SENSOR)
         async_add_devices(devices)
 
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_SENSOR_FILTER,
+        {
+            vol.Optional(CONF_MIN_INTERVAL): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+            vol.Optional(CONF_DEADBAND): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_RELATIVE_DEADBAND): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=1)
+            ),
+        },
+        async_set_sensor_filter,
+    )
+
+    # Command latency of the homee itself.
+    async_add_devices(
+        HomeeLatencySensor(config_entry, percent) for percent in LATENCY_PERCENTILES
+    )
+
+
+async def async_set_sensor_filter(entity: Entity, call: ServiceCall) -> None:
+    """Store the publish filter of a sensor in its entity options."""
+    if not isinstance(entity, HomeeSensor):
+        raise ServiceValidationError(f"{entity.entity_id} has no publish filter")
+    keys = (CONF_MIN_INTERVAL, CONF_DEADBAND, CONF_RELATIVE_DEADBAND)
+    options = {}
+    if entity.registry_entry is not None:
+        # Keep the other entity options, like the command options.
+        options = {
+            key: value
+            for key, value in entity.registry_entry.options.get(DOMAIN, {}).items()
+            if key not in keys
+        }
+    options.update((key, call.data[key]) for key in keys if key in call.data)
+    er.async_get(entity.hass).async_update_entity_options(
+        entity.entity_id, DOMAIN, options
+    )
+
 
 class HomeeSensor(HomeeEntity, SensorEntity):
     """Representation of a homee sensor."""
@@ -356,6 +422,46 @@ class HomeeSensor(HomeeEntity, SensorEntity):
         if attribute.instance > 0:
             self._attr_translation_key = f"{self._attr_translation_key}_instance"
             self._attr_translation_placeholders = {"instance": str(attribute.instance)}
+        self._min_interval = 0.0
+        self._deadband = 0.0
+        self._relative_deadband = 0.0
+        self._read_entity_options()
+        self._published_value: float | str | None = None
+        self._published_at = 0.0
+        self._flush_deadline: float | None = None
+        self._cancel_flush: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Add the homee sensor entity to home assistant."""
+        await super().async_added_to_hass()
+        self._published_value = self.entity_description.value_fn(self._attribute)
+        self._read_entity_options()
+        self.async_on_remove(self._async_cancel_flush)
+
+    async def async_registry_entry_updated(self) -> None:
+        """Apply changed entity options."""
+        self._read_entity_options()
+
+    def _read_entity_options(self) -> None:
+        """Set the publish filter from the entity options.
+
+        Without entity options, the filter of the description is used if the
+        sensor filter option of the integration is enabled.
+        """
+        options = {}
+        if self.registry_entry is not None:
+            options = self.registry_entry.options.get(DOMAIN, {})
+        description = self.entity_description
+        filtered = self._entry.options.get(CONF_SENSOR_FILTER, False)
+        self._min_interval = options.get(
+            CONF_MIN_INTERVAL, description.min_interval if filtered else 0
+        )
+        self._deadband = options.get(
+            CONF_DEADBAND, description.deadband if filtered else 0
+        )
+        self._relative_deadband = options.get(
+            CONF_RELATIVE_DEADBAND, description.relative_deadband if filtered else 0
+        )
 
     @property
     def old_unique_id(self) -> str:
@@ -365,7 +471,64 @@ class HomeeSensor(HomeeEntity, SensorEntity):
     @property
     def native_value(self) -> float | str | None:
         """Return the native value of the sensor."""
-        return self.entity_description.value_fn(self._attribute)
+        return self._published_value
+
+    @callback
+    def _on_attribute_updated(self, attribute: HomeeAttribute) -> None:
+        """Publish the new value unless the publish filter holds it back."""
+        value = self.entity_description.value_fn(attribute)
+        published = self._published_value
+        if value == published:
+            # Attribute state changes still need a state write.
+            super()._on_attribute_updated(attribute)
+            return
+
+        now = time.monotonic()
+        delay = 0.0
+        if isinstance(value, int | float) and isinstance(published, int | float):
+            if now - self._published_at < self._min_interval:
+                delay = self._min_interval
+            if abs(value - published) < max(
+                self._deadband, self._relative_deadband * abs(published)
+            ):
+                delay = max(self._min_interval, DEADBAND_FLUSH_INTERVAL)
+
+        if not delay:
+            self._publish(value, now)
+            return
+
+        # Hold the value back, the latest one is published on the trailing edge.
+        deadline = self._published_at + delay
+        if self._flush_deadline is None or deadline < self._flush_deadline:
+            self._async_cancel_flush()
+            self._flush_deadline = deadline
+            self._cancel_flush = async_call_later(
+                self.hass, max(deadline - now, 0), self._async_flush
+            )
+
+    @callback
+    def _async_flush(self, _now: Any) -> None:
+        """Publish the latest value after it was held back."""
+        self._cancel_flush = None
+        self._flush_deadline = None
+        value = self.entity_description.value_fn(self._attribute)
+        if value != self._published_value:
+            self._publish(value, time.monotonic())
+
+    @callback
+    def _async_cancel_flush(self) -> None:
+        """Cancel a pending trailing edge publish."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+            self._flush_deadline = None
+
+    def _publish(self, value: float | str | None, now: float) -> None:
+        """Set the published value and write the state."""
+        self._async_cancel_flush()
+        self._published_value = value
+        self._published_at = now
+        super()._on_attribute_updated(self._attribute)
 
     @property
     def native_unit_of_measurement(self) -> str | None:
@@ -392,6 +555,8 @@ class HomeeNodeSensor(HomeeNodeEntity, SensorEntity):
         self._node = node
         self._attr_name = description.key
         self._attr_unique_id = f"{self._attr_unique_id}-{description.key}"
+        # Node sensors only show properties of the node itself.
+        self.track_attributes()
 
     @property
     def old_unique_id(self) -> str:
@@ -402,3 +567,44 @@ class HomeeNodeSensor(HomeeNodeEntity, SensorEntity):
     def native_value(self) -> str | None:
         """Return the sensors value."""
         return self.entity_description.value_fn(self._node)
+
+
+class HomeeLatencySensor(SensorEntity):
+    """Represents a percentile of the command latency of a homee."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_translation_key = "command_latency"
+
+    def __init__(self, entry: HomeeConfigEntry, percent: int) -> None:
+        """Initialize a homee command latency sensor."""
+        self._entry = entry
+        self._percent = percent
+        uid = entry.runtime_data.settings.uid
+        self._attr_unique_id = f"{uid}-command_latency_p{percent}"
+        self._attr_translation_placeholders = {"percentile": f"p{percent}"}
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, uid)})
+
+    async def async_added_to_hass(self) -> None:
+        """Add the command latency sensor to home assistant."""
+        homee = self._entry.runtime_data
+        self.async_on_remove(
+            homee.commands.latency.async_add_listener(self._on_latency_updated)
+        )
+        self.async_on_remove(homee.state_writes.async_track(self))
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the latency percentile in milliseconds."""
+        latency = self._entry.runtime_data.commands.latency.percentile(self._percent)
+        if latency is None:
+            return None
+        return round(latency * 1000, 1)
+
+    @callback
+    def _on_latency_updated(self) -> None:
+        self._entry.runtime_data.state_writes.async_schedule(self)
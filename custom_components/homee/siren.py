@@ -20,13 +20,10 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the cover integration."""
 
-    devices: list[HomeeSiren] = []
-    for node in config_entry.runtime_data.nodes:
-        devices.extend(
-            HomeeSiren(attribute, config_entry)
-            for attribute in node.attributes
-            if attribute.type == AttributeType.SIREN
-        )
+    devices: list[HomeeSiren] = [
+        HomeeSiren(attribute, config_entry)
+        for attribute in config_entry.runtime_data.index.attributes(AttributeType.SIREN)
+    ]
     if devices:
         async_add_devices(devices)
 
@@ -35,6 +32,7 @@ class HomeeSiren(HomeeEntity, SirenEntity):
     """Representation of a homee siren device."""
 
     _attr_supported_features = SirenEntityFeature.TURN_ON | SirenEntityFeature.TURN_OFF
+    _optimistic_commands = True
 
     @property
     def is_on(self) -> bool:
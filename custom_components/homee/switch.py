@@ -10,7 +10,7 @@ from homeassistant.const import EntityCategory, Platform
 from homeassistant.core import HomeAssistant
 
 from . import HomeeConfigEntry
-from .const import CLIMATE_PROFILES, LIGHT_PROFILES
+from .const import SWITCH_ATTRIBUTES
 from .entity import HomeeEntity
 from .helpers import get_name_for_enum, migrate_old_unique_ids
 
@@ -25,25 +25,6 @@ HOMEE_PLUG_PROFILES = [
     NodeProfile.IMPULSE_PLUG,
 ]
 
-HOMEE_SWITCH_ATTRIBUTES = [
-    AttributeType.AUTOMATIC_MODE_IMPULSE,
-    AttributeType.BRIEFLY_OPEN_IMPULSE,
-    AttributeType.EXTERNAL_BINARY_INPUT,
-    AttributeType.IDENTIFICATION_MODE,
-    AttributeType.IMPULSE,
-    AttributeType.LIGHT_IMPULSE,
-    AttributeType.MANUAL_OPERATION,
-    AttributeType.MOTOR_ROTATION,
-    AttributeType.OPEN_PARTIAL_IMPULSE,
-    AttributeType.ON_OFF,
-    AttributeType.PERMANENTLY_OPEN_IMPULSE,
-    AttributeType.RESET_METER,
-    AttributeType.RESTORE_LAST_KNOWN_STATE,
-    AttributeType.SWITCH_TYPE,
-    AttributeType.VENTILATE_IMPULSE,
-    AttributeType.WATCHDOG_ON_OFF,
-]
-
 DESCRIPTIVE_ATTRIBUTES = [
     AttributeType.AUTOMATIC_MODE_IMPULSE,
     AttributeType.BRIEFLY_OPEN_IMPULSE,
@@ -76,8 +57,7 @@ def get_device_class(
     attribute: HomeeAttribute, entry: HomeeConfigEntry
 ) -> SwitchDeviceClass:
     """Determine the device class a homee node based on the node profile."""
-    homee = entry.runtime_data
-    node = homee.get_node_by_id(attribute.node_id)
+    node = entry.runtime_data.index.node_of(attribute)
     if node.profile in HOMEE_PLUG_PROFILES and attribute.type == AttributeType.ON_OFF:
         return SwitchDeviceClass.OUTLET
 
@@ -100,29 +80,22 @@ async def async_setup_entry(
 ) -> None:
     """Add the homee platform for the switch component."""
 
-    devices = []
-    for node in config_entry.runtime_data.nodes:
-        devices.extend(
-            HomeeSwitch(attribute, config_entry)
-            for attribute in node.attributes
-            if (attribute.type in HOMEE_SWITCH_ATTRIBUTES and attribute.editable)
-            and not (
-                attribute.type == AttributeType.ON_OFF
-                and node.profile in LIGHT_PROFILES
-            )
-            and not (
-                attribute.type == AttributeType.MANUAL_OPERATION
-                and node.profile in CLIMATE_PROFILES
-            )
-        )
+    index = config_entry.runtime_data.index
+    devices = [
+        HomeeSwitch(attribute, config_entry)
+        for attribute in index.attributes(*SWITCH_ATTRIBUTES)
+        if attribute.editable and not index.is_node_entity_attribute(attribute)
+    ]
     if devices:
-        await migrate_old_unique_ids(hass, devices, Platform.SWITCH)
+        await migrate_old_unique_ids(hass, config_entry, devices, Platform.SWITCH)
         async_add_devices(devices)
 
 
 class HomeeSwitch(HomeeEntity, SwitchEntity):
     """Representation of a homee switch."""
 
+    _optimistic_commands = True
+
     def __init__(
         self,
         attribute: HomeeAttribute,
@@ -0,0 +1,109 @@
+"""Test the coalescing of entity state writes."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.homee.coalescer import StateWriteCoalescer
+from custom_components.homee.const import STATE_WRITE_CHUNK_SIZE
+
+
+async def test_burst_is_written_once() -> None:
+    """Test that a burst of updates writes each entity once."""
+    coalescer = StateWriteCoalescer(delay=0)
+    entity1 = MagicMock()
+    entity2 = MagicMock()
+
+    for _ in range(3):
+        coalescer.async_schedule(entity1)
+    coalescer.async_schedule(entity2)
+    await asyncio.sleep(0)
+
+    entity1.async_write_ha_state.assert_called_once()
+    entity2.async_write_ha_state.assert_called_once()
+    assert coalescer.requested == 4
+    assert coalescer.written == 2
+    assert coalescer.saved == 2
+
+
+async def test_removed_entity_is_not_written() -> None:
+    """Test that removed entities are not written."""
+    coalescer = StateWriteCoalescer(delay=0)
+    entity = MagicMock()
+
+    remove_entity = coalescer.async_track(entity)
+    coalescer.async_schedule(entity)
+    remove_entity()
+    await asyncio.sleep(0)
+
+    entity.async_write_ha_state.assert_not_called()
+
+
+async def test_write_all_entities(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that all tracked entities are written in chunks."""
+    mock_config_entry.add_to_hass(hass)
+    coalescer = StateWriteCoalescer(delay=0)
+    entities = [MagicMock() for _ in range(STATE_WRITE_CHUNK_SIZE + 1)]
+    for entity in entities:
+        coalescer.async_track(entity)
+
+    coalescer.async_write_all(hass, mock_config_entry)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    for entity in entities:
+        entity.async_write_ha_state.assert_called_once()
+
+
+async def test_unchanged_state_is_not_written() -> None:
+    """Test that writes with the same rendered state are suppressed."""
+    coalescer = StateWriteCoalescer(delay=0)
+    entity = MagicMock(
+        available=True,
+        state="on",
+        unit_of_measurement=None,
+        state_attributes=None,
+        extra_state_attributes={"Attribute state": 1},
+    )
+    entity.platform.domain = "switch"
+    coalescer.async_track(entity)
+
+    coalescer.async_schedule(entity)
+    await asyncio.sleep(0)
+    coalescer.async_schedule(entity)
+    await asyncio.sleep(0)
+    assert entity.async_write_ha_state.call_count == 1
+    assert coalescer.suppressed == {"switch": 1}
+
+    entity.state = "off"
+    coalescer.async_schedule(entity)
+    await asyncio.sleep(0)
+    assert entity.async_write_ha_state.call_count == 2
+
+
+async def test_failed_write_does_not_drop_burst(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that a failing entity does not drop the writes of the others."""
+    mock_config_entry.add_to_hass(hass)
+    coalescer = StateWriteCoalescer(delay=0)
+    failing = MagicMock()
+    failing.async_write_ha_state.side_effect = ValueError("Broken state")
+    entity = MagicMock()
+    coalescer.async_track(failing)
+    coalescer.async_track(entity)
+
+    coalescer.async_schedule(failing)
+    coalescer.async_schedule(entity)
+    await asyncio.sleep(0)
+    entity.async_write_ha_state.assert_called_once()
+
+    coalescer.async_write_all(hass, mock_config_entry)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    # The failed write is not remembered as written, so it is retried.
+    assert entity.async_write_ha_state.call_count == 1
+    assert failing.async_write_ha_state.call_count == 2
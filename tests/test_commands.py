@@ -0,0 +1,241 @@
+"""Test the outbound commands to homee."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from freezegun.api import FrozenDateTimeFactory
+from pyHomee.const import AttributeState, AttributeType
+from pyHomee.model import HomeeGroup, HomeeNode
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+    load_json_object_fixture,
+)
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.homee.commands import HomeeCommands
+from custom_components.homee.scheduler import CommandScheduler
+
+
+def _homee_with_group() -> MagicMock:
+    """Return a homee with two covers in one group."""
+    homee = MagicMock(
+        set_value=AsyncMock(),
+        send=AsyncMock(),
+        update_node=AsyncMock(),
+        update_attribute=AsyncMock(),
+    )
+    group = HomeeGroup(load_json_object_fixture("group1.json"))
+    group.nodes = [
+        HomeeNode(load_json_object_fixture("cover1.json")),
+        HomeeNode(load_json_object_fixture("cover2.json")),
+    ]
+    homee.groups = [group]
+    return homee
+
+
+async def test_group_command() -> None:
+    """Test that commands covering a whole group are sent to the group."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.group_commands = True
+    up_down = [
+        node.get_attribute_by_type(AttributeType.UP_DOWN)
+        for node in homee.groups[0].nodes
+    ]
+
+    await asyncio.gather(
+        *(commands.async_set_value(attribute, 0) for attribute in up_down)
+    )
+
+    homee.send.assert_awaited_once_with(
+        "PUT:/groups/1/attributes?target_value=0"
+        f"&attribute_type={int(AttributeType.UP_DOWN)}"
+    )
+    homee.set_value.assert_not_awaited()
+    assert commands.node_commands_saved == 1
+
+
+async def test_partial_group_falls_back_to_nodes() -> None:
+    """Test that commands for a part of a group are sent per node."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.group_commands = True
+    attribute = homee.groups[0].nodes[0].get_attribute_by_type(AttributeType.UP_DOWN)
+
+    await commands.async_set_value(attribute, 0)
+
+    homee.send.assert_not_awaited()
+    homee.set_value.assert_awaited_once_with(attribute.node_id, attribute.id, 0)
+
+
+async def test_optimistic_value_confirmed() -> None:
+    """Test that an optimistic value is kept until homee confirms it."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.optimistic = True
+    attribute = homee.groups[0].nodes[0].get_attribute_by_type(AttributeType.UP_DOWN)
+
+    await commands.async_set_value(attribute, 0, optimistic=True)
+    assert attribute.current_value == 0
+    homee.dispatcher.async_dispatch_attribute.assert_called_once_with(3, 101)
+
+    # homee acknowledges the target value first.
+    attribute.set_data(
+        {
+            **attribute.raw_data,
+            "current_value": 1,
+            "target_value": 0,
+            "state": AttributeState.WAITING_FOR_ACKNOWLEDGE,
+        }
+    )
+    commands.async_attribute_received(3, 101)
+    assert attribute.current_value == 0
+
+    attribute.set_data({**attribute.raw_data, "current_value": 0, "state": 1})
+    commands.async_attribute_received(3, 101)
+    assert commands.confirmations == 1
+    assert commands.rollbacks == 0
+
+
+async def test_optimistic_value_rolled_back(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test that an unconfirmed optimistic value is rolled back."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.optimistic = True
+    attribute = homee.groups[0].nodes[0].get_attribute_by_type(AttributeType.UP_DOWN)
+
+    await commands.async_set_value(attribute, 0, optimistic=True)
+    assert attribute.current_value == 0
+
+    freezer.tick(commands.optimistic_timeout + 1)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert attribute.current_value == 1
+    assert commands.rollbacks == 1
+
+
+async def test_slider_values_coalesced() -> None:
+    """Test that only the last value of a slider burst is sent."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.slider_quiet_period = 0
+    attribute = homee.groups[0].nodes[0].get_attribute_by_type(AttributeType.POSITION)
+
+    await asyncio.gather(
+        *(commands.async_set_value(attribute, value) for value in (10, 20, 30))
+    )
+
+    homee.set_value.assert_awaited_once_with(attribute.node_id, attribute.id, 30)
+    assert commands.slider_values_dropped == 2
+
+
+async def test_slider_leading_edge() -> None:
+    """Test that the first slider value is sent right away with leading edge."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.slider_quiet_period = 0
+    commands.slider_leading_edge = True
+    attribute = homee.groups[0].nodes[0].get_attribute_by_type(AttributeType.POSITION)
+
+    await asyncio.gather(
+        *(commands.async_set_value(attribute, value) for value in (10, 20, 30))
+    )
+
+    assert [call.args[2] for call in homee.set_value.await_args_list] == [10, 30]
+
+
+async def test_coalesced_values_sent_together() -> None:
+    """Test that a slider value does not split the values of one call."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.slider_quiet_period = 0.01
+    node = homee.groups[0].nodes[0]
+    up_down = node.get_attribute_by_type(AttributeType.UP_DOWN)
+    position = node.get_attribute_by_type(AttributeType.POSITION)
+
+    await asyncio.gather(
+        commands.async_set_value(up_down, 0, coalesce=True),
+        commands.async_set_value(position, 50, coalesce=True),
+    )
+
+    assert [call.args[1:] for call in homee.set_value.await_args_list] == [
+        (up_down.id, 0),
+        (position.id, 50),
+    ]
+    assert commands.scheduler.node_stats()[node.id]["timeouts"] == 0
+
+
+async def test_pending_slider_value_cancelled() -> None:
+    """Test that a slider value is not sent after the commands were cancelled."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    commands.slider_quiet_period = 0.01
+    attribute = homee.groups[0].nodes[0].get_attribute_by_type(AttributeType.POSITION)
+
+    set_value = asyncio.create_task(commands.async_set_value(attribute, 10))
+    await asyncio.sleep(0)
+    commands.async_cancel()
+    await asyncio.sleep(0.02)
+
+    assert set_value.cancelled()
+    homee.set_value.assert_not_awaited()
+
+
+async def test_redundant_value_skipped() -> None:
+    """Test that values homee already has are only sent with force."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+    attribute = homee.groups[0].nodes[0].get_attribute_by_type(AttributeType.UP_DOWN)
+
+    assert not await commands.async_set_value(attribute, 1)
+    homee.set_value.assert_not_awaited()
+    assert commands.redundant_skipped == 1
+
+    assert await commands.async_set_value(attribute, 1, force=True)
+    homee.set_value.assert_awaited_once_with(attribute.node_id, attribute.id, 1)
+
+
+async def test_refreshes_of_node_coalesced() -> None:
+    """Test that refreshes of several attributes of a node share a request."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+
+    await asyncio.gather(
+        commands.async_refresh(3, 101),
+        commands.async_refresh(3, 102),
+        commands.async_refresh(3, 102),
+    )
+
+    homee.update_node.assert_awaited_once_with(3)
+    homee.update_attribute.assert_not_awaited()
+    assert commands.refreshes_saved == 2
+
+
+async def test_single_attribute_refresh() -> None:
+    """Test that a single refreshed attribute is requested on its own."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+
+    await commands.async_refresh(3, 101)
+
+    homee.update_attribute.assert_awaited_once_with(3, 101)
+    homee.update_node.assert_not_awaited()
+
+
+async def test_pending_refresh_cancelled() -> None:
+    """Test that a refresh is not sent after the commands were cancelled."""
+    homee = _homee_with_group()
+    commands = HomeeCommands(homee, CommandScheduler(node_timeout=0))
+
+    refresh = asyncio.create_task(commands.async_refresh(3, 101))
+    await asyncio.sleep(0)
+    commands.async_cancel()
+    await asyncio.sleep(0.1)
+
+    assert refresh.cancelled()
+    homee.update_attribute.assert_not_awaited()
+    homee.update_node.assert_not_awaited()
@@ -1,5 +1,7 @@
 """Test homee covers."""
 
+from unittest.mock import AsyncMock, MagicMock, call
+
 from homeassistant.core import HomeAssistant
 from pyHomee import HomeeNode
 from pytest_homeassistant_custom_component.common import (
@@ -8,6 +10,7 @@ from pytest_homeassistant_custom_component.common import (
 )
 
 from custom_components.homee.cover import HomeeCover
+from custom_components.homee.dispatcher import HomeeDispatcher
 
 
 async def test_cover_open(
@@ -86,3 +89,41 @@ async def test_cover_closing(
     assert cover4.is_opening is False
     assert round(cover4.current_cover_position) == 75
     assert round(cover4.current_cover_tilt_position) == 75
+
+
+async def test_cover_ignores_untracked_attributes() -> None:
+    """Test that only attributes of the cover state trigger a state write."""
+    entry = MagicMock()
+    entry.runtime_data.dispatcher = dispatcher = HomeeDispatcher()
+    cover_node = HomeeNode(load_json_object_fixture("cover1.json"))
+    cover = HomeeCover(cover_node, entry)
+    await cover.async_added_to_hass()
+    state_writes = entry.runtime_data.state_writes
+
+    # Polling interval is not part of the cover state.
+    dispatcher.async_dispatch_attribute(cover_node.id, 105)
+    state_writes.async_schedule.assert_not_called()
+
+    # Up/down is.
+    dispatcher.async_dispatch_attribute(cover_node.id, 101)
+    state_writes.async_schedule.assert_called_once_with(cover)
+
+
+async def test_cover_set_values() -> None:
+    """Test that several values of a node are sent together."""
+    entry = MagicMock()
+    entry.runtime_data.commands.async_set_value = AsyncMock()
+    cover_node = HomeeNode(load_json_object_fixture("cover1.json"))
+    cover = HomeeCover(cover_node, entry)
+
+    await cover.async_set_values(
+        (cover_node.get_attribute_by_id(102), 50),
+        (cover_node.get_attribute_by_id(109), 10),
+    )
+
+    entry.runtime_data.commands.async_set_value.assert_has_awaits(
+        [
+            call(cover_node.get_attribute_by_id(102), 50, True, False, coalesce=True),
+            call(cover_node.get_attribute_by_id(109), 10, True, False, coalesce=True),
+        ]
+    )
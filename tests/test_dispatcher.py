@@ -0,0 +1,58 @@
+"""Test the dispatcher of homee updates."""
+
+from unittest.mock import MagicMock
+
+from pyHomee.model import HomeeNode
+from pytest_homeassistant_custom_component.common import load_json_object_fixture
+
+from custom_components.homee.dispatcher import HomeeDispatcher
+
+
+async def test_dispatch_attribute() -> None:
+    """Test that updates reach the subscribers of their key only."""
+    dispatcher = HomeeDispatcher()
+    node = HomeeNode(load_json_object_fixture("cover1.json"))
+    up_down = node.get_attribute_by_id(101)
+    listener1 = MagicMock()
+    listener2 = MagicMock()
+    remove1 = dispatcher.async_subscribe_attribute(up_down, listener1)
+    dispatcher.async_subscribe_attribute(up_down, listener2)
+
+    dispatcher.async_dispatch_attribute(node.id, 101)
+    dispatcher.async_dispatch_attribute(node.id, 105)
+    listener1.assert_called_once_with(up_down)
+    listener2.assert_called_once_with(up_down)
+
+    remove1()
+    dispatcher.async_dispatch_attribute(node.id, 101)
+    assert listener1.call_count == 1
+    assert listener2.call_count == 2
+
+    assert dispatcher.stats()["3-101"] == {
+        "subscribers": 1,
+        "updates": 2,
+        "fan_out": 3,
+    }
+    assert dispatcher.stats()["3-105"]["fan_out"] == 0
+
+
+async def test_dispatch_node() -> None:
+    """Test that node updates reach node and attribute subscribers."""
+    dispatcher = HomeeDispatcher()
+    node_data = load_json_object_fixture("cover1.json")
+    node = HomeeNode(node_data)
+    node_listener = MagicMock()
+    attribute_listener = MagicMock()
+    dispatcher.async_subscribe_node(node, node_listener)
+    remove = dispatcher.async_subscribe_attribute(
+        node.get_attribute_by_id(101), attribute_listener
+    )
+
+    dispatcher.async_dispatch_node(node_data)
+    node_listener.assert_called_once_with(node)
+    attribute_listener.assert_called_once()
+
+    remove()
+    assert "3-101" not in {
+        key for key, stats in dispatcher.stats().items() if stats["subscribers"]
+    }
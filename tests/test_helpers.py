@@ -0,0 +1,43 @@
+"""Test the homee helpers."""
+
+from unittest.mock import MagicMock
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.homee.const import DOMAIN
+from custom_components.homee.helpers import (
+    get_registered_unique_ids,
+    migrate_old_unique_ids,
+)
+
+from .conftest import HOMEE_ID
+
+
+async def test_migration_conflict_with_other_entry(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that a unique id of another homee entry is not taken over."""
+    mock_config_entry.add_to_hass(hass)
+    other_entry = MockConfigEntry(domain=DOMAIN, unique_id="OTHER")
+    other_entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    old_entry = registry.async_get_or_create(
+        "sensor", DOMAIN, "5-sensor-10", config_entry=mock_config_entry
+    )
+    other = registry.async_get_or_create(
+        "sensor", DOMAIN, f"{HOMEE_ID}-5-10", config_entry=other_entry
+    )
+    mock_config_entry.runtime_data = MagicMock(
+        registered_unique_ids=get_registered_unique_ids(
+            hass, mock_config_entry.entry_id
+        ),
+    )
+    device = MagicMock(old_unique_id="5-sensor-10", unique_id=f"{HOMEE_ID}-5-10")
+
+    await migrate_old_unique_ids(hass, mock_config_entry, [device], "sensor")
+
+    assert registry.async_get(old_entry.entity_id).unique_id == "5-sensor-10"
+    assert registry.async_get(other.entity_id).unique_id == f"{HOMEE_ID}-5-10"
@@ -0,0 +1,238 @@
+"""Test the homee hub runtime data."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from pyHomee import HomeeAuthFailedException, HomeeConnectionFailedException
+from pyHomee.model import HomeeNode, HomeeSettings
+from pytest_homeassistant_custom_component.common import load_json_object_fixture
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.homee.hub import HomeeHub, get_backoff
+
+from .conftest import HOMEE_ID, HOMEE_IP, TESTPASS, TESTUSER
+
+
+def _hub_with_nodes(*fixtures: str) -> HomeeHub:
+    """Return a hub that knows the nodes of the given fixtures."""
+    hub = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    hub.settings = HomeeSettings({"uid": HOMEE_ID, "version": "2.41.0"})
+    hub.nodes = [HomeeNode(load_json_object_fixture(name)) for name in fixtures]
+    return hub
+
+
+async def test_snapshot_roundtrip() -> None:
+    """Test that a snapshot restores settings, nodes and attribute values."""
+    hub = _hub_with_nodes("cover1.json", "cover2.json")
+    snapshot = hub.as_snapshot()
+
+    restored = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    restored.restore_snapshot(snapshot)
+
+    assert restored.restored
+    assert restored.settings.uid == HOMEE_ID
+    assert [node.id for node in restored.nodes] == [node.id for node in hub.nodes]
+    assert [attribute.current_value for attribute in restored.nodes[0].attributes] == [
+        attribute.current_value for attribute in hub.nodes[0].attributes
+    ]
+
+
+async def test_snapshot_reconcile() -> None:
+    """Test that the live dump removes stale nodes and flags changes."""
+    hub = _hub_with_nodes("cover1.json")
+    snapshot = hub.as_snapshot()
+
+    restored = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    restored.restore_snapshot(snapshot)
+    restored.build_index()
+    await restored.on_message({"all": {"nodes": snapshot["nodes"]}})
+    assert not restored.topology_changed
+    assert len(restored.nodes) == 1
+
+    await restored.on_message({"all": {"nodes": []}})
+    assert restored.topology_changed
+    assert restored.nodes == []
+    assert not restored.index.has_node(3)
+
+
+async def test_run_when_reachable_retries_token() -> None:
+    """Test that the connection starts once homee hands out a token."""
+    hub = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    with (
+        patch.object(
+            hub,
+            "get_access_token",
+            side_effect=[HomeeConnectionFailedException("unreachable"), "token"],
+        ) as get_access_token,
+        patch.object(hub, "open_ws", side_effect=hub.disconnect) as open_ws,
+        patch("custom_components.homee.hub.get_backoff", return_value=0),
+    ):
+        await hub.run_when_reachable()
+
+    assert get_access_token.await_count == 2
+    open_ws.assert_awaited_once()
+
+
+async def test_retry_now_skips_backoff() -> None:
+    """Test that a retry can be started before the backoff ended."""
+    hub = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    wait = asyncio.create_task(hub._async_wait_for_retry(600))
+    await asyncio.sleep(0)
+
+    hub.retry_now()
+
+    await asyncio.wait_for(wait, 1)
+
+
+async def test_auth_failure_retried() -> None:
+    """Test that failed authentication is retried, but reported only once."""
+    hub = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    with (
+        patch.object(
+            hub,
+            "get_access_token",
+            side_effect=[
+                HomeeAuthFailedException("wrong password"),
+                HomeeAuthFailedException("wrong password"),
+                "token",
+            ],
+        ) as get_access_token,
+        patch.object(hub, "open_ws", side_effect=hub.disconnect) as open_ws,
+        patch("custom_components.homee.hub.get_backoff", return_value=0),
+        patch("custom_components.homee.hub._LOGGER") as logger,
+    ):
+        await asyncio.wait_for(hub.run_when_reachable(), 1)
+
+    assert get_access_token.await_count == 3
+    open_ws.assert_awaited_once()
+    logger.warning.assert_called_once()
+
+
+async def test_no_probe_after_rejected_connection() -> None:
+    """Test that homee is only probed when it was not reachable."""
+    hub = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    with (
+        patch.object(hub, "async_probe", return_value=True) as async_probe,
+        patch("custom_components.homee.hub.RECONNECT_PROBE_INTERVAL", 0.01),
+    ):
+        wait = asyncio.create_task(hub._async_wait_for_retry(0.05))
+        await asyncio.sleep(0.03)
+        assert not wait.done()
+        await asyncio.wait_for(wait, 1)
+        async_probe.assert_not_awaited()
+
+        await asyncio.wait_for(hub._async_wait_for_retry(600, probe=True), 1)
+        async_probe.assert_awaited_once()
+
+
+def test_backoff_grows_with_jitter() -> None:
+    """Test that the reconnect delay starts fast and is capped."""
+    assert 0.5 <= get_backoff(0) <= 1
+    assert 4 <= get_backoff(3) <= 8
+    assert 150 <= get_backoff(30) <= 300
+
+
+async def test_refresh_all_dispatches_changes() -> None:
+    """Test that a refresh only passes changed attributes to the entities."""
+    hub = _hub_with_nodes("cover1.json")
+    hub.build_index()
+    hub.connected = True
+    listener = MagicMock()
+    hub.dispatcher.async_subscribe_attribute(
+        hub.nodes[0].get_attribute_by_id(101), listener
+    )
+    nodes_data = hub.as_snapshot()["nodes"]
+    nodes_data[0]["attributes"][2] = {
+        **nodes_data[0]["attributes"][2],
+        "current_value": 50.0,
+    }
+
+    with patch.object(hub, "send") as send:
+        refresh = asyncio.create_task(hub.async_refresh_all())
+        await asyncio.sleep(0)
+        send.assert_awaited_once_with("GET:all")
+    await hub.on_message({"all": {"nodes": nodes_data}})
+
+    assert await refresh == {
+        "nodes": 1,
+        "attributes": len(nodes_data[0]["attributes"]),
+        "changed_attributes": 1,
+    }
+    listener.assert_not_called()
+
+
+async def test_refresh_all_sent_again_after_failure() -> None:
+    """Test that a refresh without an answer does not block later ones."""
+    hub = _hub_with_nodes("cover1.json")
+    hub.build_index()
+
+    with pytest.raises(HomeAssistantError):
+        await hub.async_refresh_all()
+
+    hub.connected = True
+    with patch.object(hub, "send") as send:
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(0.01):
+                await hub.async_refresh_all()
+
+        refresh = asyncio.create_task(hub.async_refresh_all())
+        await asyncio.sleep(0)
+        await hub.on_disconnected()
+        with pytest.raises(HomeAssistantError):
+            await refresh
+
+    assert send.await_count == 2
+
+
+async def test_resync_after_reconnect_counts_drift() -> None:
+    """Test that attributes changed while offline are counted after connecting."""
+    hub = _hub_with_nodes("cover1.json")
+    hub.build_index()
+    nodes_data = hub.as_snapshot()["nodes"]
+    nodes_data[0]["attributes"][1] = {
+        **nodes_data[0]["attributes"][1],
+        "current_value": 0.0,
+    }
+
+    await hub.on_connected()
+    await hub.on_message({"all": {"nodes": hub.as_snapshot()["nodes"]}})
+    await hub.on_connected()
+    await hub.on_message({"all": {"nodes": nodes_data}})
+
+    await asyncio.wait_for(hub.async_wait_resynced(), 1)
+    assert hub.resyncs == 1
+    assert hub.drift == 1
+
+
+async def test_cold_start_counts_no_drift() -> None:
+    """Test that the first node dump without earlier data is no drift."""
+    hub = _hub_with_nodes("cover1.json")
+    nodes_data = hub.as_snapshot()["nodes"]
+
+    with patch("custom_components.homee.hub._LOGGER") as logger:
+        await hub.on_connected()
+        await hub.on_message({"all": {"nodes": nodes_data}})
+
+    await asyncio.wait_for(hub.async_wait_resynced(), 1)
+    assert hub.resyncs == 0
+    assert hub.drift == 0
+    logger.info.assert_not_called()
+
+
+async def test_node_state_change_dispatches_attributes() -> None:
+    """Test that a node going unavailable reaches its attribute entities."""
+    hub = _hub_with_nodes("cover1.json")
+    hub.build_index()
+    listener = MagicMock()
+    hub.dispatcher.async_subscribe_attribute(
+        hub.nodes[0].get_attribute_by_id(101), listener
+    )
+    node_data = hub.as_snapshot()["nodes"][0]
+
+    await hub.on_message({"node": node_data})
+    listener.assert_not_called()
+
+    await hub.on_message({"node": {**node_data, "state": 2}})
+    listener.assert_called_once()
@@ -0,0 +1,39 @@
+"""Test the homee node and attribute index."""
+
+from pyHomee.const import AttributeType, NodeProfile
+from pyHomee.model import HomeeNode
+from pytest_homeassistant_custom_component.common import load_json_object_fixture
+
+from homeassistant.const import Platform
+
+from custom_components.homee.index import HomeeIndex
+
+
+async def test_index_buckets() -> None:
+    """Test that nodes and attributes are bucketed by profile and type."""
+    nodes = [
+        HomeeNode(load_json_object_fixture(name))
+        for name in ("cover1.json", "cover2.json")
+    ]
+    index = HomeeIndex(nodes)
+
+    assert index.nodes(NodeProfile.SHUTTER_POSITION_SWITCH) == nodes
+    assert index.nodes(NodeProfile.DIMMABLE_LIGHT) == []
+
+    up_down = index.attributes(AttributeType.UP_DOWN)
+    assert [attribute.node_id for attribute in up_down] == [node.id for node in nodes]
+    assert index.node_of(up_down[0]) is nodes[0]
+    assert not index.is_node_entity_attribute(up_down[0])
+    assert index.get_attribute(nodes[1].id, up_down[1].id) is up_down[1]
+    assert index.get_attribute(nodes[1].id, 0) is None
+
+
+async def test_index_platforms() -> None:
+    """Test that only platforms with matching nodes are selected."""
+    index = HomeeIndex([HomeeNode(load_json_object_fixture("cover1.json"))])
+    platforms = index.platforms()
+
+    assert {Platform.COVER, Platform.SENSOR, Platform.BINARY_SENSOR} <= platforms
+    assert Platform.FAN not in platforms
+    assert Platform.LIGHT not in platforms
+    assert Platform.SIREN not in platforms
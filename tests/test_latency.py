@@ -0,0 +1,54 @@
+"""Test the command latency tracking."""
+
+from unittest.mock import patch
+
+from pyHomee.const import NodeProtocol
+from pyHomee.model import HomeeNode
+from pytest_homeassistant_custom_component.common import load_json_object_fixture
+
+from custom_components.homee.latency import CommandLatency, percentile
+
+
+async def test_latency_from_send_to_echo() -> None:
+    """Test that the time until homee echoes an attribute is recorded."""
+    node = HomeeNode(load_json_object_fixture("cover1.json"))
+    attribute = node.get_attribute_by_id(101)
+    latency = CommandLatency()
+
+    with patch("custom_components.homee.latency.time.monotonic", return_value=10.0):
+        latency.async_sent(attribute, NodeProtocol.ZWAVE)
+    with patch("custom_components.homee.latency.time.monotonic", return_value=10.25):
+        latency.async_echo(3, 101)
+        # Later updates are not echoes of a command.
+        latency.async_echo(3, 101)
+
+    assert latency.percentile(50) == 0.25
+    assert latency.node_stats()[3] == {
+        "protocol": "zwave",
+        "attributes": {
+            "up_down": {"samples": 1, "p50": 0.25, "p95": 0.25, "p99": 0.25}
+        },
+    }
+
+
+async def test_no_latency_without_command() -> None:
+    """Test that updates without a command are ignored."""
+    latency = CommandLatency()
+
+    latency.async_echo(3, 101)
+
+    assert latency.percentile(50) is None
+    assert latency.node_stats() == {}
+
+
+def test_nearest_rank_percentile() -> None:
+    """Test the nearest-rank percentiles of several samples."""
+    assert percentile([1, 2, 3, 4, 5], 50) == 3
+    assert percentile([1, 2, 3, 4], 50) == 2
+    samples = list(range(1, 101))
+    assert percentile(samples, 0) == 1
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 95) == 95
+    assert percentile(samples, 99) == 99
+    assert percentile(samples, 100) == 100
+    assert percentile(list(range(1, 21)), 95) == 19
@@ -0,0 +1,95 @@
+"""Test the pacing of commands sent to homee."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from pyHomee.const import NodeProtocol
+
+from custom_components.homee.scheduler import CommandQueueFullError, CommandScheduler
+
+
+async def test_protocol_rate() -> None:
+    """Test that commands to one protocol are spread out."""
+    scheduler = CommandScheduler(
+        rate=1000, protocol_rates={NodeProtocol.ZWAVE: 20}, queue_size=10
+    )
+    send = AsyncMock()
+
+    await asyncio.gather(
+        *(scheduler.async_run(NodeProtocol.ZWAVE, send) for _ in range(3))
+    )
+
+    assert send.await_count == 3
+    stats = scheduler.stats()["zwave"]
+    assert stats["max_queue_depth"] == 2
+    assert stats["queue_depth"] == 0
+    assert stats["max_wait"] >= 0.09
+
+
+async def test_queue_full() -> None:
+    """Test that commands beyond the queue size are rejected."""
+    scheduler = CommandScheduler(
+        rate=1000, protocol_rates={NodeProtocol.ZWAVE: 20}, queue_size=1
+    )
+    send = AsyncMock()
+
+    results = await asyncio.gather(
+        *(scheduler.async_run(NodeProtocol.ZWAVE, send) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[2], CommandQueueFullError)
+    assert send.await_count == 2
+    assert scheduler.stats()["zwave"]["rejected"] == 1
+
+
+async def test_other_protocols_not_delayed() -> None:
+    """Test that a busy protocol does not delay the nodes of another one."""
+    scheduler = CommandScheduler(
+        rate=1000, protocol_rates={NodeProtocol.ZWAVE: 1}, queue_size=10
+    )
+    send = AsyncMock()
+
+    await scheduler.async_run(NodeProtocol.ZWAVE, send)
+    await asyncio.wait_for(scheduler.async_run(NodeProtocol.ZIG_BEE, send), 0.5)
+
+    assert send.await_count == 2
+
+
+async def test_node_paced_by_updates() -> None:
+    """Test that commands to a node wait until homee updated the node."""
+    scheduler = CommandScheduler(rate=1000, protocol_rates={}, queue_size=10)
+    send = AsyncMock()
+
+    await asyncio.gather(
+        scheduler.async_run(NodeProtocol.ZWAVE, send, 3),
+        scheduler.async_run(NodeProtocol.ZWAVE, send, 3),
+    )
+    assert send.await_count == 2
+
+    second = asyncio.create_task(scheduler.async_run(NodeProtocol.ZWAVE, send, 3))
+    third = asyncio.create_task(scheduler.async_run(NodeProtocol.ZWAVE, send, 3))
+    await scheduler.async_run(NodeProtocol.ZWAVE, send, 4)
+    await asyncio.sleep(0.01)
+    assert send.await_count == 3
+    assert not second.done()
+
+    scheduler.async_node_updated(3)
+    await asyncio.gather(second, third)
+    assert send.await_count == 5
+    assert scheduler.node_stats()[3]["max_wait"] > 0
+    assert scheduler.node_stats()[3]["timeouts"] == 0
+
+
+async def test_node_timeout() -> None:
+    """Test that a node that does not update does not block its commands."""
+    scheduler = CommandScheduler(
+        rate=1000, protocol_rates={}, queue_size=10, node_timeout=0.01
+    )
+    send = AsyncMock()
+
+    await scheduler.async_run(NodeProtocol.ZWAVE, send, 3)
+    await asyncio.wait_for(scheduler.async_run(NodeProtocol.ZWAVE, send, 3), 0.5)
+
+    assert send.await_count == 2
+    assert scheduler.node_stats()[3]["timeouts"] == 1
@@ -0,0 +1,106 @@
+"""Test homee sensors."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from pyHomee.const import AttributeType
+from pyHomee.model import HomeeAttribute
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.homee.const import CONF_SENSOR_FILTER, DOMAIN
+from custom_components.homee.sensor import SENSOR_DESCRIPTIONS, HomeeSensor
+
+from .conftest import HOMEE_ID
+
+
+def _power_attribute(value: float) -> HomeeAttribute:
+    """Return a power attribute with the given value."""
+    return HomeeAttribute(
+        {
+            "id": 10,
+            "node_id": 5,
+            "instance": 0,
+            "current_value": value,
+            "target_value": value,
+            "unit": "W",
+            "editable": 0,
+            "type": AttributeType.CURRENT_ENERGY_USE,
+            "state": 1,
+            "data": "",
+            "name": "",
+        }
+    )
+
+
+def _power_sensor(
+    hass: HomeAssistant, attribute: HomeeAttribute, options: dict[str, bool]
+) -> HomeeSensor:
+    """Return a power sensor of a config entry with the given options."""
+    entry = MagicMock(options=options)
+    entry.runtime_data.settings.uid = HOMEE_ID
+    sensor = HomeeSensor(
+        attribute, entry, SENSOR_DESCRIPTIONS[AttributeType.CURRENT_ENERGY_USE]
+    )
+    sensor.hass = hass
+    sensor._published_value = attribute.current_value
+    return sensor
+
+
+async def test_power_jitter_is_held_back(hass: HomeAssistant) -> None:
+    """Test that small and fast changes are published on the trailing edge."""
+    attribute = _power_attribute(100.0)
+    sensor = _power_sensor(hass, attribute, {CONF_SENSOR_FILTER: True})
+    state_writes = sensor._entry.runtime_data.state_writes
+
+    # Inside the deadband: held back until the deadband flush interval.
+    attribute.set_data({**attribute.raw_data, "current_value": 101.0})
+    sensor._on_attribute_updated(attribute)
+    assert sensor.native_value == 100.0
+    state_writes.async_schedule.assert_not_called()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+    await hass.async_block_till_done()
+    assert sensor.native_value == 101.0
+    state_writes.async_schedule.assert_called_once_with(sensor)
+
+    # Outside the deadband, but within the minimum interval.
+    attribute.set_data({**attribute.raw_data, "current_value": 200.0})
+    sensor._on_attribute_updated(attribute)
+    attribute.set_data({**attribute.raw_data, "current_value": 300.0})
+    sensor._on_attribute_updated(attribute)
+    assert sensor.native_value == 101.0
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=67))
+    await hass.async_block_till_done()
+    assert sensor.native_value == 300.0
+    assert state_writes.async_schedule.call_count == 2
+
+
+async def test_no_filter_by_default(hass: HomeAssistant) -> None:
+    """Test that every change is published without the sensor filter option."""
+    attribute = _power_attribute(100.0)
+    sensor = _power_sensor(hass, attribute, {})
+
+    attribute.set_data({**attribute.raw_data, "current_value": 101.0})
+    sensor._on_attribute_updated(attribute)
+
+    assert sensor.native_value == 101.0
+
+
+async def test_entity_options_override_filter(hass: HomeAssistant) -> None:
+    """Test that the entity options replace the filter of the description."""
+    attribute = _power_attribute(100.0)
+    sensor = _power_sensor(hass, attribute, {})
+    sensor.registry_entry = MagicMock(options={DOMAIN: {"deadband": 5}})
+    sensor._read_entity_options()
+
+    attribute.set_data({**attribute.raw_data, "current_value": 104.0})
+    sensor._on_attribute_updated(attribute)
+    assert sensor.native_value == 100.0
+
+    attribute.set_data({**attribute.raw_data, "current_value": 106.0})
+    sensor._on_attribute_updated(attribute)
+    assert sensor.native_value == 106.0
@@ -0,0 +1,205 @@
+"""Test the homee services."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from pyHomee.model import HomeeNode
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    load_json_object_fixture,
+)
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+
+from custom_components.homee.const import (
+    DOMAIN,
+    SERVICE_SET_COMMAND_OPTIONS,
+    SERVICE_SET_VALUE,
+)
+from custom_components.homee.entity import HomeeEntity
+from custom_components.homee.hub import HomeeHub
+
+from .conftest import HOMEE_IP, TESTPASS, TESTUSER
+
+
+async def _setup_homee(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> HomeeHub:
+    """Register the services and return a connected homee with a cover."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    mock_config_entry.add_to_hass(hass)
+    mock_config_entry.mock_state(hass, ConfigEntryState.LOADED)
+    homee = HomeeHub(HOMEE_IP, TESTUSER, TESTPASS)
+    homee.nodes = [HomeeNode(load_json_object_fixture("cover1.json"))]
+    homee.build_index()
+    homee.connected = True
+    homee.set_value = AsyncMock()
+    mock_config_entry.runtime_data = homee
+    return homee
+
+
+async def test_set_values(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that a failed value does not hide the results of the others."""
+    homee = await _setup_homee(hass, mock_config_entry)
+
+    async def set_value(node_id: int, attribute_id: int, value: float) -> None:
+        if node_id == 98:
+            raise ConnectionError("Send failed")
+
+    homee.set_value.side_effect = set_value
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_VALUE,
+        {
+            "config_entry_id": mock_config_entry.entry_id,
+            "node": 3,
+            "attribute": 101,
+            "value": 0,
+            "values": [
+                {"node": 99, "attribute": 1, "value": 5},
+                {"node": 98, "attribute": 1, "value": 5},
+            ],
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["succeeded"] == 2
+    assert response["failed"] == 1
+    results = response["results"]
+    assert [result["node"] for result in results] == [3, 99, 98]
+    assert results[0]["skipped"] is False
+    assert results[2]["success"] is False
+    assert results[2]["error"] == "Send failed"
+    assert homee.set_value.await_count == 3
+
+
+async def test_set_value_force(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that a value homee already has is only sent with force."""
+    homee = await _setup_homee(hass, mock_config_entry)
+    data = {
+        "config_entry_id": mock_config_entry.entry_id,
+        "node": 3,
+        "attribute": 101,
+        "value": 1,
+    }
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_SET_VALUE, data, blocking=True, return_response=True
+    )
+    assert response["results"][0]["skipped"] is True
+    homee.set_value.assert_not_awaited()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_VALUE,
+        {**data, "force": True},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["results"][0]["skipped"] is False
+    homee.set_value.assert_awaited_once_with(3, 101, 1)
+
+
+async def test_set_value_max_parallel(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that no more values than max_parallel are set at once."""
+    homee = await _setup_homee(hass, mock_config_entry)
+    running = 0
+    max_running = 0
+
+    async def set_value(node_id: int, attribute_id: int, value: float) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    homee.set_value.side_effect = set_value
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_VALUE,
+        {
+            "config_entry_id": mock_config_entry.entry_id,
+            "values": [
+                {"node": node_id, "attribute": 1, "value": 5}
+                for node_id in range(90, 95)
+            ],
+            "max_parallel": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["succeeded"] == 5
+    assert max_running == 2
+
+
+async def test_set_value_slider_not_coalesced(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that every item for a slider is sent."""
+    homee = await _setup_homee(hass, mock_config_entry)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_VALUE,
+        {
+            "config_entry_id": mock_config_entry.entry_id,
+            "values": [
+                {"node": 3, "attribute": 102, "value": 30},
+                {"node": 3, "attribute": 102, "value": 60},
+            ],
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["succeeded"] == 2
+    assert [result["skipped"] for result in response["results"]] == [False, False]
+    assert homee.set_value.await_count == 2
+
+
+async def test_set_command_options(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Test that redundant commands can be allowed per entity."""
+    homee = await _setup_homee(hass, mock_config_entry)
+    registry = er.async_get(hass)
+    entity_entry = registry.async_get_or_create(
+        "switch", DOMAIN, "test-3-101", config_entry=mock_config_entry
+    )
+    registry.async_update_entity_options(
+        entity_entry.entity_id, DOMAIN, {"deadband": 1}
+    )
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_COMMAND_OPTIONS,
+        {"entity_id": entity_entry.entity_id, "skip_redundant_commands": False},
+        blocking=True,
+    )
+
+    entity_entry = registry.async_get(entity_entry.entity_id)
+    assert entity_entry.options[DOMAIN] == {
+        "deadband": 1,
+        "skip_redundant_commands": False,
+    }
+
+    homee.commands.async_set_value = AsyncMock()
+    entity = HomeeEntity(homee.nodes[0].get_attribute_by_id(101), mock_config_entry)
+    entity.registry_entry = entity_entry
+    await entity.async_set_value(1)
+    homee.commands.async_set_value.assert_awaited_once_with(
+        entity._attribute, 1, False, force=True
+    )